@@ -0,0 +1,266 @@
+"""로컬 JSON API (주문 / 포지션 / 백테스트)
+
+Streamlit 없이 단독 실행 가능 - 서버 재시작 직후에도 주문 봇이 앱 화면을
+열지 않고 바로 접속할 수 있도록 서비스로 띄움:
+
+    python -m api [--host 127.0.0.1] [--port 8502]
+
+앱(opp.py)도 포트가 비어 있으면 같은 핸들러를 앱의 데이터 캐시로 함께 실행.
+계좌 파일은 현재 폴더 기준 (앱과 같은 폴더에서 실행).
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from engine import (
+    TICKER, N_SIGMA, BUY_MULT, SELL_MULT, WEIGHTS, TRADE_LABELS, ResultCache, cached_backtest,
+    cached_sigma_features, data_snapshot_id, json_default, parse_weights, snapshot_meta, today_orders
+)
+from providers import MarketDataCache, make_providers
+from store import DATA_FILE, load_data, TradeStore
+
+API_HOST = "127.0.0.1"
+DEFAULT_API_PORT = 8502
+
+def api_port():
+    """API 포트 (LSW_API_PORT, 0이면 비활성 - 호출할 때마다 환경 변수를 읽음)"""
+    return int(os.environ.get("LSW_API_PORT", DEFAULT_API_PORT))
+
+class ApiContext:
+    """API가 쓰는 시장 데이터 조회 함수 + 결과 캐시
+
+    market_data(days, tickers=None), backtest_data(days): 종가 DataFrame 또는 None.
+    앱은 st.cache_data 래퍼와 앱 결과 캐시를, 단독 실행은 standalone_context를 사용.
+    """
+
+    def __init__(self, market_data, backtest_data, result_cache):
+        self.market_data = market_data
+        self.backtest_data = backtest_data
+        self.result_cache = result_cache
+
+def standalone_context(config=None):
+    """Streamlit 없이 쓰는 컨텍스트 (시장 데이터 10분 / 백테스트 데이터 1시간 캐시)"""
+    providers = make_providers(config)
+    return ApiContext(MarketDataCache(providers, ttl=600), MarketDataCache(providers, ttl=3600), ResultCache())
+
+# ==========================================
+# 경로별 처리 (key, build) - key가 같으면 캐시된 응답 재사용
+# ==========================================
+def account_files():
+    """계좌명 → 데이터 파일 (기본 계좌 + lsw_loc_data_<계좌명>.json)"""
+    files = {"default": DATA_FILE}
+    prefix = DATA_FILE[:-len(".json")] + "_"
+    for path in sorted(glob.glob(prefix + "*.json")):
+        files[path[len(prefix):-len(".json")]] = path
+    return files
+
+def _file_version(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _finite(value):
+    """JSON 응답용: NaN/inf → None, NumPy 스칼라 → 파이썬 값"""
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(v) for v in value]
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (float, np.floating)):
+        return float(value) if np.isfinite(value) else None
+    return value
+
+def _api_accounts(query):
+    files = account_files()
+    if "account" not in query:
+        return files
+    if query["account"] not in files:
+        raise KeyError(f"unknown account: {query['account']}")
+    return {query["account"]: files[query["account"]]}
+
+def api_orders(context, query):
+    """GET /orders[?account=] - 계좌별 오늘의 LOC 주문"""
+    data = context.market_data(60)
+    if data is None or len(data) < 2:
+        raise LookupError("market data unavailable")
+    accounts = _api_accounts(query)
+    key = ("orders", data_snapshot_id(data), tuple((name, _file_version(path)) for name, path in accounts.items()))
+
+    def build():
+        features = cached_sigma_features(context.result_cache, data)
+        orders = {}
+        for name, path in accounts.items():
+            saved = load_data(path)
+            orders[name] = today_orders(data, saved.get("seed", 37000.0), saved.get("qty", 0), saved.get("avg", 0.0), saved.get("step", 1),
+                                        features=features)
+        return {"ticker": TICKER, "snapshot": snapshot_meta(data), "orders": orders}
+
+    return key, build
+
+def api_position(context, query):
+    """GET /position[?account=] - 저장된 포지션 + 거래 기록 집계"""
+    accounts = _api_accounts(query)
+    key = ("position", tuple((name, _file_version(path)) for name, path in accounts.items()))
+
+    def build():
+        positions = {}
+        for name, path in accounts.items():
+            saved = load_data(path)
+            store = TradeStore(saved.get("trades", []))
+            positions[name] = {
+                "seed": saved.get("seed", 37000.0),
+                "qty": saved.get("qty", 0),
+                "avg": saved.get("avg", 0.0),
+                "step": saved.get("step", 1),
+                "recorded_qty": store.open_qty,
+                "recorded_avg": store.open_cost / store.open_qty if store.open_qty > 0 else 0.0,
+                "trades": store.summary()
+            }
+        return {"ticker": TICKER, "positions": positions}
+
+    return key, build
+
+def api_backtest(context, query):
+    """GET /backtest?days=&seed=&n_sigma=&buy_mult=&sell_mult=&weights=&series=1 - 백테스트 성과"""
+    days = int(query.get("days", 365))
+    weights = parse_weights(query.get("weights", ":".join(str(w) for w in WEIGHTS)))
+    if weights is None:
+        raise ValueError("invalid weights")
+    params = {
+        "seed": float(query.get("seed", 37000)),
+        "n_sigma": int(query.get("n_sigma", N_SIGMA)),
+        "buy_mult": float(query.get("buy_mult", BUY_MULT)),
+        "sell_mult": float(query.get("sell_mult", SELL_MULT)),
+        "weights": weights
+    }
+    if params["n_sigma"] < 1 or params["seed"] <= 0:
+        raise ValueError("n_sigma must be >= 1 and seed > 0")
+    series = query.get("series", "0") == "1"
+
+    data = context.backtest_data(days)
+    if data is None or len(data) < 10:
+        raise LookupError("market data unavailable")
+    key = ("backtest", data_snapshot_id(data), days, params["seed"], params["n_sigma"], params["buy_mult"], params["sell_mult"], tuple(weights), series)
+
+    def build():
+        bt, metrics = cached_backtest(context.result_cache, data, **params)
+        body = {"ticker": TICKER, "params": params, "snapshot": snapshot_meta(data), "metrics": metrics}
+        if series and bt is not None:
+            body["series"] = {
+                "date": [str(d)[:10] for d in bt.date],
+                "close": bt.close.tolist(),
+                "total_value": bt.total_value.tolist(),
+                "trade_type": [TRADE_LABELS.get(int(t)) for t in bt.trade_type]
+            }
+        return body
+
+    return key, build
+
+def api_stats(context, query):
+    """GET /stats - 결과 캐시 통계 (캐시하지 않음)"""
+    return None, lambda: {"cache": context.result_cache.stats()}
+
+API_ROUTES = {
+    "/orders": api_orders,
+    "/position": api_position,
+    "/backtest": api_backtest,
+    "/stats": api_stats
+}
+
+# ==========================================
+# HTTP 서버
+# ==========================================
+class ApiHandler(BaseHTTPRequestHandler):
+    """JSON API 요청 처리 (응답은 데이터 스냅샷별 캐시 + ETag, 컨텍스트는 server.context)"""
+
+    def do_GET(self):
+        context = self.server.context
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        route = API_ROUTES.get(url.path.rstrip("/") or "/")
+        if route is None:
+            return self._send(404, {"error": "not found", "routes": sorted(API_ROUTES)})
+
+        try:
+            key, build = route(context, query)
+        except (ValueError, KeyError) as e:
+            return self._send(400, {"error": str(e.args[0]) if e.args else str(e)})
+        except LookupError as e:
+            return self._send(503, {"error": str(e)})
+
+        if key is None:
+            return self._send(200, build())
+
+        etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            return self._send(304, None, etag)
+        try:
+            body = context.result_cache.get_or_compute(("api", key), lambda: self._encode(build()))
+        except Exception as e:
+            return self._send(500, {"error": str(e)})
+        return self._send(200, body, etag)
+
+    def _encode(self, payload):
+        return json.dumps(_finite(payload), ensure_ascii=False, default=json_default).encode("utf-8")
+
+    def _send(self, status, payload, etag=None):
+        body = payload if isinstance(payload, bytes) or payload is None else self._encode(payload)
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(context, port=DEFAULT_API_PORT, host=API_HOST):
+    """컨텍스트를 쓰는 API 서버 (시작은 호출한 쪽에서)"""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.context = context
+    return server
+
+def start_api_server(context, port=None, host=API_HOST):
+    """API 서버를 백그라운드 스레드로 시작 (포트 0이면 비활성, 사용 중이면 None)"""
+    port = api_port() if port is None else port
+    if not port:
+        return None
+    try:
+        server = make_server(context, port, host)
+    except OSError:
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True, name="lsw-api").start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LSW LOC 로컬 JSON API (Streamlit 앱 없이 실행)")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=api_port() or DEFAULT_API_PORT)
+    parser.add_argument("--provider", help="시장 데이터 공급자 (기본 LSW_DATA_PROVIDER)")
+    args = parser.parse_args(argv)
+
+    server = make_server(standalone_context(args.provider), args.port, args.host)
+    print(f"LSW API: http://{args.host}:{server.server_address[1]} ({', '.join(sorted(API_ROUTES))})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
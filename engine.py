@@ -0,0 +1,1343 @@
+"""LSW LOC 엔진 - 시그널, 백테스트, 성과 지표, 결과 저장 / 캐시
+
+Streamlit 없이 import 가능. 앱(opp.py)은 스크립트가 매 실행마다 다시
+정의되므로, 캐시에 남는 결과 클래스(BacktestResult 등)는 여기에 두어
+실행 간 클래스가 같게 유지됨.
+"""
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 전략 파라미터 (고정)
+# ==========================================
+TICKER = "UPRO"
+N_SIGMA = 2
+BUY_MULT = 0.85
+SELL_MULT = 0.35
+N_SPLIT = 3
+WEIGHTS = [1, 1, 2]  # 1:1:2 비율
+PORTFOLIO_TICKERS = ["UPRO", "TQQQ", "SOXL", "TECL"]  # 멀티 티커 백테스트 후보
+
+def parse_weights(text):
+    """회차 비중 문자열 ("1:1:2", "1,1,2") → 리스트, 형식 오류 시 None"""
+    try:
+        weights = [float(w) for w in text.replace(",", ":").split(":") if w.strip()]
+    except ValueError:
+        return None
+    if not weights or min(weights) <= 0:
+        return None
+    return [int(w) if w.is_integer() else w for w in weights]
+
+# ==========================================
+# 시그널 커널 (실전 주문 / 백테스트 공용)
+# ==========================================
+SIGMA_MAX_WINDOW = 60  # σ 특징 캐시에 미리 계산하는 최대 윈도우 (일)
+
+def rolling_sigma_table(prices, max_window=SIGMA_MAX_WINDOW):
+    """윈도우 1..max_window 전체의 롤링 σ를 누적합으로 한 번에 계산
+
+    수익률과 수익률 제곱의 누적합 두 개로 모든 윈도우의 분산을 O(바)씩 구함.
+    상쇄 오차를 줄이려고 수익률 전체 평균을 빼고 누적 (분산은 평행이동 불변).
+    반환: (max_window+1, 바[, 종목]) 배열. table[n]은 compute_signals(prices, n)의
+    σ와 같음 (부동소수 오차 수준 차이), table[0], table[1]은 0.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    table = np.zeros((max_window + 1,) + prices.shape)
+    if len(prices) < 2:
+        return table
+    returns = prices[1:] / prices[:-1] - 1
+    returns = returns - returns.mean(axis=0)
+    zero = np.zeros((1,) + returns.shape[1:])
+    c1 = np.concatenate([zero, np.cumsum(returns, axis=0)])
+    c2 = np.concatenate([zero, np.cumsum(returns * returns, axis=0)])
+    floor = 4 * np.finfo(np.float64).eps * c2
+    for n in range(2, min(max_window, len(returns)) + 1):  # n=1은 항상 0
+        mean = (c1[n:] - c1[:-n]) / n
+        var = (c2[n:] - c2[:-n]) / n - mean * mean
+        # 누적합 반올림 오차 이하는 0 (같은 수익률이 이어진 구간)
+        table[n, n:] = np.sqrt(np.where(var > floor[n:] / n, var, 0))
+    return table
+
+def compute_signals(prices, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, features=None):
+    """바별 σ 및 다음 거래일 LOC 가격 계산
+
+    바 t의 값은 t 종가까지의 데이터만 사용 (최근 n_sigma개 일간 수익률의
+    표준편차, ddof=0). 데이터가 부족한 앞부분의 σ는 0.
+    prices가 (바 × 종목) 2차원이면 종목별로 계산.
+    features: 같은 prices의 rolling_sigma_table (있으면 σ를 다시 계산하지 않음)
+    반환: (sigma, buy_loc, sell_loc) 배열
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if features is not None and n_sigma < len(features):
+        sigma = features[n_sigma]
+    else:
+        sigma = np.zeros(prices.shape)
+        if len(prices) > n_sigma:
+            returns = prices[1:] / prices[:-1] - 1
+            windows = np.lib.stride_tricks.sliding_window_view(returns, n_sigma, axis=0)
+            sigma[n_sigma:] = windows.std(axis=-1)
+    
+    buy_loc = prices * (1 + buy_mult * sigma)
+    sell_loc = prices * (1 + sell_mult * sigma)
+    return sigma, buy_loc, sell_loc
+
+def buy_target(seed, step, weights=WEIGHTS):
+    """회차별 매수 목표 금액 (step: 완료된 매수 회차, 0부터)"""
+    if step < 0 or step >= len(weights):
+        return 0
+    return seed * (weights[step] / sum(weights))
+
+def today_orders(data, seed, qty, avg, step, features=None):
+    """오늘의 LOC 주문 (오늘의 주문 탭 / API 공용)
+
+    step: 화면 기준 매수 회차 (1부터). 시그널은 compute_signals 마지막 바.
+    features: data[TICKER]의 rolling_sigma_table (있으면 σ를 다시 계산하지 않음)
+    """
+    last_close = float(data[TICKER].iloc[-1])
+    prev_close = float(data[TICKER].iloc[-2])
+    rate = float(data['USDKRW=X'].iloc[-1])
+    
+    used_cash = qty * avg
+    pnl_usd = (last_close - avg) * qty if qty > 0 else 0
+    
+    # 시그널 (백테스트와 동일한 커널, 마지막 바)
+    sigma, buy_locs, sell_locs = compute_signals(data[TICKER].values, features=features)
+    buy_loc = float(buy_locs[-1])
+    
+    # 화면의 회차는 1부터, 커널은 완료된 회차(0부터) 기준
+    target = buy_target(seed, step - 1)
+    remaining = seed - used_cash
+    
+    return {
+        "date": data.index[-1].strftime("%Y-%m-%d"),
+        "close": last_close,
+        "change_pct": (last_close - prev_close) / prev_close * 100,
+        "rate": rate,
+        "sigma": float(sigma[-1]),
+        "step": step,
+        "buy_loc": buy_loc,
+        "buy_qty": int(min(target, remaining) / buy_loc) if buy_loc > 0 else 0,
+        "sell_loc": float(sell_locs[-1]),
+        "sell_qty": qty,
+        "used_cash": used_cash,
+        "remaining": remaining,
+        "progress": (used_cash / seed * 100) if seed > 0 else 0,
+        "pnl_usd": pnl_usd,
+        "pnl_krw": pnl_usd * rate,
+        "pnl_pct": (pnl_usd / used_cash * 100) if used_cash > 0 else 0
+    }
+
+# ==========================================
+# 백테스트 결과 (컬럼형 저장)
+# ==========================================
+TRADE_NONE = 0
+TRADE_BUY = 1
+TRADE_SELL = 2
+TRADE_LABELS = {TRADE_BUY: "BUY", TRADE_SELL: "SELL"}
+
+class BacktestResult:
+    """백테스트 결과 - 바(bar)별 값을 타입이 지정된 NumPy 배열로 보관"""
+
+    # (컬럼명, dtype) - to_frame() 컬럼 순서와 동일
+    COLUMNS = (
+        ("date", "datetime64[ns]"),
+        ("close", "float64"),
+        ("buy_loc", "float64"),
+        ("sell_loc", "float64"),
+        ("sigma", "float32"),
+        ("cash", "float64"),
+        ("qty", "int32"),
+        ("avg_price", "float64"),
+        ("total_value", "float64"),
+        ("pnl_pct", "float32"),
+        ("trade_type", "int8"),
+        ("trade_qty", "int32"),
+        ("trade_price", "float64"),
+        ("step", "int8"),
+    )
+
+    def __init__(self, n):
+        """n개 바 크기로 배열 미리 할당"""
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(n, dtype=dtype))
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    @property
+    def nbytes(self):
+        """배열 전체 메모리 사용량 (bytes)"""
+        return sum(getattr(self, name).nbytes for name, _ in self.COLUMNS)
+
+    def to_frame(self):
+        """UI 표시용 DataFrame 변환 (trade_type은 BUY/SELL/None 문자열)"""
+        df = pd.DataFrame({name: getattr(self, name) for name, _ in self.COLUMNS})
+        df["trade_type"] = pd.Series(self.trade_type).map(TRADE_LABELS).astype(object)
+        df.loc[self.trade_type == TRADE_NONE, "trade_type"] = None
+        return df
+
+    @classmethod
+    def from_columns(cls, columns):
+        """컬럼명 → 배열 매핑을 복사 없이 감싸기 (메모리 맵 배열 등)"""
+        result = cls.__new__(cls)
+        for name, _ in cls.COLUMNS:
+            setattr(result, name, columns[name])
+        return result
+
+    @classmethod
+    def from_frame(cls, df):
+        """run_backtest DataFrame 형식에서 변환"""
+        result = cls(len(df))
+        codes = {label: code for code, label in TRADE_LABELS.items()}
+        for name, _ in cls.COLUMNS:
+            values = df[name].map(codes).fillna(TRADE_NONE) if name == "trade_type" else df[name]
+            getattr(result, name)[:] = values.values
+        return result
+
+# ==========================================
+# 백테스팅 함수
+# ==========================================
+def run_backtest(data, seed=37000, n_sigma=2, buy_mult=0.85, sell_mult=0.35, weights=[1,1,2], features=None):
+    """백테스팅 실행 (BacktestResult 반환, features: σ 특징 테이블)"""
+    if data is None or len(data) < n_sigma + 2:
+        return None
+    
+    prices = data[TICKER].values.astype(np.float64)
+    dates = data.index
+    
+    # 시그널 계산 (바 i의 주문 = 바 i-1 종가 기준 시그널, 실전 주문과 동일)
+    sigmas, buy_locs, sell_locs = compute_signals(prices, n_sigma, buy_mult, sell_mult, features)
+    
+    # 초기 상태
+    cash = seed
+    qty = 0
+    avg_price = 0
+    step = 0  # 완료된 매수 회차 (0: 포지션 없음)
+    
+    start = n_sigma + 1
+    result = BacktestResult(len(prices) - start)
+    result.date[:] = dates[start:].values
+    result.close[:] = prices[start:]
+    result.sigma[:] = sigmas[start-1:-1]
+    result.buy_loc[:] = buy_locs[start-1:-1]
+    result.sell_loc[:] = sell_locs[start-1:-1]
+    
+    # 바별 루프는 상태 전이만 (파이썬 float 리스트로 순회, 나머지는 벡터 연산)
+    closes = prices[start:].tolist()
+    buy_levels = buy_locs[start-1:-1].tolist()
+    sell_levels = sell_locs[start-1:-1].tolist()
+    targets = [buy_target(seed, k, weights) for k in range(len(weights) + 1)]
+    cash_out, qty_out, avg_out, step_out, type_out, trade_qty_out = [], [], [], [], [], []
+    
+    for close, buy_loc, sell_loc in zip(closes, buy_levels, sell_levels):
+        # 매수/매도 신호
+        buy_signal = close <= buy_loc and step < len(weights)
+        sell_signal = close >= sell_loc and qty > 0
+        
+        # 거래 실행
+        trade_type = TRADE_NONE
+        trade_qty = 0
+        
+        if sell_signal:
+            # 매도 (전량)
+            trade_type = TRADE_SELL
+            trade_qty = qty
+            cash += qty * close
+            qty = 0
+            avg_price = 0
+            step = 0
+        
+        target_amount = targets[step]
+        if buy_signal and target_amount > 0:
+            # 매수
+            buy_qty = int(target_amount / close)
+            
+            if buy_qty > 0 and cash >= buy_qty * close:
+                trade_type = TRADE_BUY
+                trade_qty = buy_qty
+                
+                # 평균단가 계산
+                total_value = qty * avg_price + buy_qty * close
+                qty += buy_qty
+                avg_price = total_value / qty if qty > 0 else 0
+                cash -= buy_qty * close
+                step += 1
+        
+        cash_out.append(cash)
+        qty_out.append(qty)
+        avg_out.append(avg_price)
+        step_out.append(step)
+        type_out.append(trade_type)
+        trade_qty_out.append(trade_qty)
+    
+    result.cash[:] = cash_out
+    result.qty[:] = qty_out
+    result.avg_price[:] = avg_out
+    result.step[:] = step_out
+    result.trade_type[:] = type_out
+    result.trade_qty[:] = trade_qty_out
+    
+    # 자산 계산
+    result.total_value[:] = result.cash + result.qty * result.close
+    result.pnl_pct[:] = (result.total_value / seed - 1) * 100 if seed > 0 else 0
+    result.trade_price[:] = np.where(result.trade_type != TRADE_NONE, result.close, 0)
+    
+    return result
+
+# ==========================================
+# 성과 지표 계산
+# ==========================================
+def _daily_returns(values):
+    """일간 수익률 (pct_change().dropna()와 동일)"""
+    return values[1:] / values[:-1] - 1 if len(values) > 1 else values[:0]
+
+def _drawdown_min(values):
+    """최대낙폭 (%)"""
+    peak = np.maximum.accumulate(values)
+    return float(((values - peak) / peak * 100).min())
+
+def _std(values):
+    """표본 표준편차 (pandas std()와 동일, ddof=1)"""
+    return float(np.std(values, ddof=1)) if len(values) > 1 else float("nan")
+
+RISK_FREE = 0.04  # 샤프 비율 무위험 이자율
+
+# 전략 우위 스코어보드: (표시 이름, 지표, 높을수록 좋은지)
+SCOREBOARD = (
+    ("수익률", "total_return", True),
+    ("MDD", "mdd", True),  # 음수 %, 0에 가까울수록 좋음
+    ("샤프비율", "sharpe", True),
+    ("변동성", "volatility", False),
+)
+
+def calculate_metrics(bt, seed):
+    """백테스트 성과 지표 계산 (확장) - BacktestResult 또는 DataFrame"""
+    if bt is None or len(bt) == 0:
+        return {}
+    if isinstance(bt, pd.DataFrame):
+        bt = BacktestResult.from_frame(bt)
+    
+    values = bt.total_value.astype(np.float64)
+    closes = bt.close.astype(np.float64)
+    
+    final_value = float(values[-1])
+    total_return = (final_value / seed - 1) * 100
+    
+    # MDD 계산
+    mdd = _drawdown_min(values)
+    
+    # 거래 횟수
+    buy_count = int((bt.trade_type == TRADE_BUY).sum())
+    sell_count = int((bt.trade_type == TRADE_SELL).sum())
+    
+    # Buy & Hold
+    first_close = float(closes[0])
+    last_close = float(closes[-1])
+    bh_return = (last_close / first_close - 1) * 100
+    bh_final = seed * (last_close / first_close)
+    
+    # Buy & Hold MDD
+    bh_mdd = _drawdown_min(seed * (closes / first_close))
+    
+    # 일 수 계산
+    days = len(bt)
+    years = days / 252  # 거래일 기준
+    
+    # CAGR 계산 (연환산 수익률)
+    if years > 0:
+        cagr = ((final_value / seed) ** (1 / years) - 1) * 100
+        bh_cagr = ((bh_final / seed) ** (1 / years) - 1) * 100
+    else:
+        cagr = total_return
+        bh_cagr = bh_return
+    
+    # 일간 수익률 계산
+    daily_returns = _daily_returns(values)
+    bh_daily_returns = _daily_returns(closes)
+    
+    # 변동성 (연환산)
+    volatility = _std(daily_returns) * np.sqrt(252) * 100
+    bh_volatility = _std(bh_daily_returns) * np.sqrt(252) * 100
+    
+    # 샤프 비율 (무위험 이자율 4% 가정)
+    risk_free = RISK_FREE
+    if volatility > 0:
+        sharpe = (cagr / 100 - risk_free) / (volatility / 100)
+    else:
+        sharpe = 0
+    
+    if bh_volatility > 0:
+        bh_sharpe = (bh_cagr / 100 - risk_free) / (bh_volatility / 100)
+    else:
+        bh_sharpe = 0
+    
+    # 승률 계산 (양수 수익 일 비율)
+    win_rate = (daily_returns > 0).sum() / len(daily_returns) * 100 if len(daily_returns) > 0 else 0
+    bh_win_rate = (bh_daily_returns > 0).sum() / len(bh_daily_returns) * 100 if len(bh_daily_returns) > 0 else 0
+    
+    # 최고/최저 일간 수익률
+    max_daily = daily_returns.max() * 100 if len(daily_returns) > 0 else 0
+    min_daily = daily_returns.min() * 100 if len(daily_returns) > 0 else 0
+    bh_max_daily = bh_daily_returns.max() * 100 if len(bh_daily_returns) > 0 else 0
+    bh_min_daily = bh_daily_returns.min() * 100 if len(bh_daily_returns) > 0 else 0
+    
+    return {
+        "initial": seed,
+        "final": final_value,
+        "total_return": total_return,
+        "mdd": mdd,
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "win_rate": win_rate,
+        "max_daily": max_daily,
+        "min_daily": min_daily,
+        "buy_count": buy_count,
+        "sell_count": sell_count,
+        "days": days,
+        "bh_final": bh_final,
+        "bh_return": bh_return,
+        "bh_mdd": bh_mdd,
+        "bh_cagr": bh_cagr,
+        "bh_volatility": bh_volatility,
+        "bh_sharpe": bh_sharpe,
+        "bh_win_rate": bh_win_rate,
+        "bh_max_daily": bh_max_daily,
+        "bh_min_daily": bh_min_daily
+    }
+
+# ==========================================
+# 멀티 티커 포트폴리오 (공용 현금)
+# ==========================================
+PORTFOLIO_PRIORITIES = ("deepest", "order", "lowest_step")
+
+class PortfolioResult:
+    """포트폴리오 백테스트 결과 - (바 × 종목) NumPy 배열"""
+
+    def __init__(self, dates, tickers, closes):
+        n, k = closes.shape
+        self.tickers = list(tickers)
+        self.date = np.asarray(dates, dtype="datetime64[ns]")
+        self.close = closes
+        self.cash = np.zeros(n)
+        self.total_value = np.zeros(n)
+        self.buy_loc = np.zeros((n, k))
+        self.sell_loc = np.zeros((n, k))
+        self.qty = np.zeros((n, k), dtype=np.int32)
+        self.avg_price = np.zeros((n, k))
+        self.step = np.zeros((n, k), dtype=np.int8)
+        self.trade_type = np.zeros((n, k), dtype=np.int8)
+        self.trade_qty = np.zeros((n, k), dtype=np.int32)
+        self.skipped = np.zeros((n, k), dtype=bool)  # 현금 부족으로 못한 매수
+
+    def __len__(self):
+        return len(self.cash)
+
+    def arrays(self):
+        """결과 배열 전체 (캐시 크기 계산 / 읽기 전용 처리용)"""
+        return [value for value in vars(self).values() if isinstance(value, np.ndarray)]
+
+    @property
+    def nbytes(self):
+        """배열 전체 메모리 사용량 (bytes)"""
+        return sum(a.nbytes for a in self.arrays())
+
+    def to_frame(self):
+        """날짜별 합계 + 종목별 수량/회차 DataFrame"""
+        df = pd.DataFrame({"date": self.date, "cash": self.cash, "total_value": self.total_value})
+        for j, ticker in enumerate(self.tickers):
+            df[f"{ticker}_qty"] = self.qty[:, j]
+            df[f"{ticker}_step"] = self.step[:, j]
+        return df
+
+def run_portfolio_backtest(data, tickers, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT,
+                           weights=WEIGHTS, allocation=None, priority="deepest", features=None):
+    """여러 종목을 하나의 현금으로 동시에 운용하는 σ 전략 백테스트
+
+    종목마다 회차와 LOC 가격은 따로, 현금은 공용. 매수 목표 금액은
+    seed × 종목 배분 × 회차 비중 (allocation: 종목별 seed 대비 예산 비율,
+    기본 균등. 합이 1보다 크면 현금이 부족한 날이 생김).
+    같은 날 매수 주문 합계가 현금보다 많으면
+    priority 순서대로 체결 가능한 주문만 체결:
+      deepest     - LOC 가격 대비 하락폭이 큰 종목 우선
+      order       - tickers 순서
+      lowest_step - 완료된 회차가 적은 종목 우선
+    단일 종목, allocation=[1]이면 run_backtest와 같은 결과.
+    features: tickers 순서의 σ 특징 테이블 (get_sigma_features)
+    """
+    if priority not in PORTFOLIO_PRIORITIES:
+        raise ValueError(f"priority must be one of {PORTFOLIO_PRIORITIES}")
+    if data is None or len(data) < n_sigma + 2:
+        return None
+    
+    prices = data[list(tickers)].values.astype(np.float64)
+    k = prices.shape[1]
+    allocation = np.full(k, 1 / k) if allocation is None else np.asarray(allocation, dtype=np.float64)
+    
+    _, buy_locs, sell_locs = compute_signals(prices, n_sigma, buy_mult, sell_mult, features)
+    
+    # 회차별 목표 금액 (마지막 행 = 회차 완료, 0)
+    weights = np.asarray(weights, dtype=np.float64)
+    step_targets = np.vstack([np.outer(weights / weights.sum(), seed * allocation), np.zeros(k)])
+    n_rounds = len(weights)
+    columns = np.arange(k)
+    
+    # 초기 상태
+    cash = float(seed)
+    qty = np.zeros(k, dtype=np.int64)
+    avg_price = np.zeros(k)
+    step = np.zeros(k, dtype=np.int64)
+    
+    start = n_sigma + 1
+    result = PortfolioResult(data.index[start:], tickers, prices[start:])
+    result.buy_loc[:] = buy_locs[start-1:-1]
+    result.sell_loc[:] = sell_locs[start-1:-1]
+    
+    for i in range(start, len(prices)):
+        close = prices[i]
+        buy_loc = buy_locs[i-1]
+        sell_loc = sell_locs[i-1]
+        j = i - start
+        
+        buy_signal = (close <= buy_loc) & (step < n_rounds)
+        
+        # 매도 (전량)
+        sell = (close >= sell_loc) & (qty > 0)
+        if sell.any():
+            cash += float(np.sum(qty[sell] * close[sell]))
+            result.trade_type[j, sell] = TRADE_SELL
+            result.trade_qty[j, sell] = qty[sell]
+            qty[sell] = 0
+            avg_price[sell] = 0
+            step[sell] = 0
+        
+        # 매수 (현금 부족 시 우선순위 배분)
+        buy_qty = (step_targets[step, columns] / close).astype(np.int64)
+        candidates = np.flatnonzero(buy_signal & (buy_qty > 0))
+        if len(candidates) > 0:
+            cost = buy_qty * close
+            if cost[candidates].sum() > cash:
+                if priority == "deepest":
+                    candidates = candidates[np.argsort(close[candidates] / buy_loc[candidates], kind="stable")]
+                elif priority == "lowest_step":
+                    candidates = candidates[np.argsort(step[candidates], kind="stable")]
+                filled = []
+                for c in candidates:
+                    if cash >= cost[c]:
+                        cash -= cost[c]
+                        filled.append(c)
+                    else:
+                        result.skipped[j, c] = True
+                filled = np.asarray(filled, dtype=np.int64)
+            else:
+                filled = candidates
+                cash -= float(cost[filled].sum())
+            
+            if len(filled) > 0:
+                avg_price[filled] = (qty[filled] * avg_price[filled] + cost[filled]) / (qty[filled] + buy_qty[filled])
+                qty[filled] += buy_qty[filled]
+                step[filled] += 1
+                result.trade_type[j, filled] = TRADE_BUY
+                result.trade_qty[j, filled] = buy_qty[filled]
+        
+        result.cash[j] = cash
+        result.total_value[j] = cash + float(np.dot(qty, close))
+        result.qty[j] = qty
+        result.avg_price[j] = avg_price
+        result.step[j] = step
+    
+    return result
+
+def portfolio_metrics(pr, seed, allocation=None):
+    """포트폴리오 성과 지표 (calculate_metrics 형식, B&H = 같은 배분의 바스켓)"""
+    if pr is None or len(pr) == 0:
+        return {}
+    k = len(pr.tickers)
+    allocation = np.full(k, 1 / k) if allocation is None else np.asarray(allocation, dtype=np.float64) / np.sum(allocation)
+    
+    basket = BacktestResult(len(pr))
+    basket.date[:] = pr.date
+    basket.close[:] = (pr.close / pr.close[0]) @ allocation
+    basket.total_value[:] = pr.total_value
+    metrics = calculate_metrics(basket, seed)
+    metrics["buy_count"] = int((pr.trade_type == TRADE_BUY).sum())
+    metrics["sell_count"] = int((pr.trade_type == TRADE_SELL).sum())
+    metrics["skipped_count"] = int(pr.skipped.sum())
+    return metrics
+
+# ==========================================
+# 파라미터 스윕
+# ==========================================
+def run_sweep(data, seed=37000, n_sigmas=(N_SIGMA,), buy_mults=(BUY_MULT,), sell_mults=(SELL_MULT,), weights=WEIGHTS,
+              features=None):
+    """파라미터 조합별 백테스트 성과 (행 = 조합)
+
+    σ는 조합마다 다시 계산하지 않고 특징 테이블 하나를 공유
+    (features: n_sigmas를 모두 포함하는 rolling_sigma_table, 없으면 한 번 계산).
+    """
+    if features is None or len(features) <= max(n_sigmas):
+        features = rolling_sigma_table(data[TICKER].values, max(SIGMA_MAX_WINDOW, *n_sigmas))
+    rows = []
+    for n_sigma, buy_mult, sell_mult in itertools.product(n_sigmas, buy_mults, sell_mults):
+        bt = run_backtest(data, seed, n_sigma, buy_mult, sell_mult, weights, features)
+        metrics = calculate_metrics(bt, seed)
+        if metrics:
+            rows.append({"n_sigma": n_sigma, "buy_mult": buy_mult, "sell_mult": sell_mult, **metrics})
+    return pd.DataFrame(rows)
+
+# ==========================================
+# 파라미터 공간 분할 (배수 평면의 정확한 응답면)
+# ==========================================
+MULT_RANGE = (-2.0, 2.0)  # What-if 배수 슬라이더 범위
+
+def _split_regions(regions, mask, axis, at):
+    """mask 영역을 axis 구간의 at 값에서 둘로 나눔 (원래 행 = 위쪽, 추가 행 = 아래쪽)
+
+    반환: 행 인덱스 (다른 배열도 같은 인덱스로 맞출 때 사용)
+    """
+    rows = np.flatnonzero(mask)
+    index = np.concatenate([np.arange(len(mask)), rows])
+    for key in regions:
+        regions[key] = regions[key][index]
+    regions[axis + "_lo"][rows] = at
+    regions[axis + "_hi"][len(mask):] = at
+    return index
+
+def partition_parameter_space(data, seed=37000, n_sigma=N_SIGMA, weights=WEIGHTS, buy_range=MULT_RANGE, sell_range=MULT_RANGE,
+                              objective="total_return", features=None, max_regions=500_000):
+    """(buy_mult, sell_mult) 평면을 체결 결과가 같은 영역으로 나눈 정확한 응답면
+
+    n_sigma가 고정이면 바 i의 신호는 분기점 x_i = (종가_i / 종가_i-1 - 1) / σ_i-1 에
+    대해 매수 buy_mult > x_i, 매도 sell_mult < x_i 로만 갈림. 범위 전체를 직사각형
+    영역 하나로 시작해 바를 순서대로 진행하면서, 그 바의 매수/매도가 실제로
+    상태를 바꾸는 영역만 x_i에서 둘로 나눔 (분할 전까지의 시뮬레이션은 공유).
+    영역들은 NumPy 행으로 한꺼번에 진행하고 성과 지표는 바마다 누적.
+    영역 내부의 모든 배수 조합은 run_backtest와 같은 거래를 만듦 (경계 위의 값은
+    반올림에 따라 어느 쪽이든 될 수 있음).
+    반환: {"regions": 영역별 DataFrame (buy_lo, buy_hi, sell_lo, sell_hi, area,
+           buy_mult / sell_mult = 영역 중심, calculate_metrics 지표),
+           "best": objective가 가장 큰 영역, "breakpoints": 범위 안 분기점 수, "n_sigma"}
+    """
+    if data is None or len(data) < n_sigma + 2:
+        return None
+    
+    prices = data[TICKER].values.astype(np.float64)
+    sigmas = compute_signals(prices, n_sigma, features=features)[0]
+    start = n_sigma + 1
+    closes = prices[start:]
+    prev, sigma = prices[start-1:-1], sigmas[start-1:-1]
+    
+    # 바별 분기점 (σ = 0이면 배수와 무관: 하락/보합이면 매수, 상승/보합이면 매도)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (closes / prev - 1) / sigma
+    x_buy = np.where(sigma > 0, x, np.where(closes <= prev, -np.inf, np.inf))
+    x_sell = np.where(sigma > 0, x, np.where(closes >= prev, np.inf, -np.inf))
+    
+    n_rounds = len(weights)
+    targets = np.array([buy_target(seed, k, weights) for k in range(n_rounds + 1)], dtype=np.float64)
+    
+    # 영역별 상태 + 지표 누적값 (행 = 영역)
+    regions = {
+        "buy_lo": np.array([float(buy_range[0])]), "buy_hi": np.array([float(buy_range[1])]),
+        "sell_lo": np.array([float(sell_range[0])]), "sell_hi": np.array([float(sell_range[1])]),
+        "cash": np.array([float(seed)]), "qty": np.zeros(1), "avg_price": np.zeros(1),
+        "step": np.zeros(1, dtype=np.int64), "buy_count": np.zeros(1, dtype=np.int64), "sell_count": np.zeros(1, dtype=np.int64),
+        "value": np.zeros(1), "peak": np.zeros(1), "mdd": np.zeros(1),
+        "sum_r": np.zeros(1), "sum_r2": np.zeros(1), "wins": np.zeros(1, dtype=np.int64)
+    }
+    r = regions
+    
+    for t in range(len(closes)):
+        close = closes[t]
+        
+        # 매도 (보유 중이고 sell_mult < x 인 쪽)
+        xs = x_sell[t]
+        _split_regions(r, (r["qty"] > 0) & (r["sell_lo"] < xs) & (xs < r["sell_hi"]), "sell", xs)
+        sell = (r["qty"] > 0) & (xs >= r["sell_hi"])
+        pre_step = r["step"].copy()  # 매수 가능 여부는 매도 전 회차 기준 (run_backtest와 동일)
+        r["cash"] = np.where(sell, r["cash"] + r["qty"] * close, r["cash"])
+        r["qty"][sell] = 0
+        r["avg_price"][sell] = 0
+        r["step"][sell] = 0
+        
+        # 매수 (회차/현금상 체결 가능하고 buy_mult > x 인 쪽)
+        buy_qty = np.floor(targets[r["step"]] / close)
+        can_buy = (pre_step < n_rounds) & (targets[r["step"]] > 0) & (buy_qty > 0) & (r["cash"] >= buy_qty * close)
+        xb = x_buy[t]
+        index = _split_regions(r, can_buy & (r["buy_lo"] < xb) & (xb < r["buy_hi"]), "buy", xb)
+        buy_qty, can_buy = buy_qty[index], can_buy[index]
+        buy = can_buy & (xb <= r["buy_lo"])
+        sell = sell[index]
+        total_cost = r["qty"] * r["avg_price"] + buy_qty * close
+        r["qty"] = np.where(buy, r["qty"] + buy_qty, r["qty"])
+        r["avg_price"] = np.where(buy, total_cost / np.where(buy, r["qty"], 1), r["avg_price"])
+        r["cash"] = np.where(buy, r["cash"] - buy_qty * close, r["cash"])
+        r["step"] += buy
+        r["buy_count"] += buy
+        r["sell_count"] += sell & ~buy  # 같은 날 매도 후 매수는 매수로 기록 (run_backtest의 trade_type)
+        
+        if len(r["cash"]) > max_regions:
+            raise ValueError(f"more than {max_regions} regions; narrow buy_range / sell_range")
+        
+        # 지표 누적
+        value = r["cash"] + r["qty"] * close
+        if t == 0:
+            r["peak"] = value.copy()
+        else:
+            ret = value / r["value"] - 1
+            r["sum_r"] += ret
+            r["sum_r2"] += ret * ret
+            r["wins"] += ret > 0
+            r["peak"] = np.maximum(r["peak"], value)
+            r["mdd"] = np.minimum(r["mdd"], (value - r["peak"]) / r["peak"] * 100)
+        r["value"] = value
+    
+    # 영역별 성과 (calculate_metrics와 같은 정의)
+    days = len(closes)
+    m = days - 1
+    final = r["value"]
+    total_return = (final / seed - 1) * 100
+    cagr = ((final / seed) ** (252 / days) - 1) * 100
+    if m > 1:
+        volatility = np.sqrt(np.maximum(r["sum_r2"] - r["sum_r"] ** 2 / m, 0) / (m - 1)) * np.sqrt(252) * 100
+    else:
+        volatility = np.full(len(final), np.nan)
+    sharpe = np.divide(cagr / 100 - RISK_FREE, volatility / 100, out=np.zeros(len(final)), where=volatility > 0)
+    
+    df = pd.DataFrame({
+        "buy_lo": r["buy_lo"], "buy_hi": r["buy_hi"], "sell_lo": r["sell_lo"], "sell_hi": r["sell_hi"],
+        "area": (r["buy_hi"] - r["buy_lo"]) * (r["sell_hi"] - r["sell_lo"]),
+        "buy_mult": (r["buy_lo"] + r["buy_hi"]) / 2, "sell_mult": (r["sell_lo"] + r["sell_hi"]) / 2,
+        "final": final, "total_return": total_return, "cagr": cagr, "mdd": r["mdd"],
+        "volatility": volatility, "sharpe": sharpe, "win_rate": r["wins"] / m * 100 if m > 0 else 0.0,
+        "buy_count": r["buy_count"], "sell_count": r["sell_count"]
+    }).sort_values(["buy_lo", "sell_lo"], ignore_index=True)
+    
+    in_buy = (x_buy > buy_range[0]) & (x_buy < buy_range[1])
+    in_sell = (x_sell > sell_range[0]) & (x_sell < sell_range[1])
+    return {
+        "regions": df,
+        "best": df.loc[df[objective].idxmax()].to_dict(),
+        "breakpoints": {"buy": int(in_buy.sum()), "sell": int(in_sell.sum())},
+        "n_sigma": n_sigma
+    }
+
+# ==========================================
+# 시작일 민감도 분석 (롤링 윈도우)
+# ==========================================
+def _sim_step(close, buy_loc, sell_loc, seed, weights, cash, qty, avg_price, step):
+    """바 1개 진행 (run_backtest와 동일 규칙)
+
+    반환: (cash, qty, avg_price, step, margin)
+    margin: 매수 시도 시 현금 - 매수 금액 (시도 없으면 nan)
+    """
+    margin = np.nan
+    buy_signal = close <= buy_loc and step < len(weights)
+    
+    if close >= sell_loc and qty > 0:
+        cash += qty * close
+        qty = 0
+        avg_price = 0
+        step = 0
+    
+    target_amount = buy_target(seed, step, weights)
+    if buy_signal and target_amount > 0:
+        buy_qty = int(target_amount / close)
+        if buy_qty > 0:
+            margin = cash - buy_qty * close
+            if margin >= 0:
+                avg_price = (qty * avg_price + buy_qty * close) / (qty + buy_qty)
+                qty += buy_qty
+                cash -= buy_qty * close
+                step += 1
+    
+    return cash, qty, avg_price, step, margin
+
+def rolling_window_analysis(data, window=252, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS, stride=1,
+                            features=None):
+    """모든 롤링 윈도우(길이 window 바)의 σ 전략 / Buy & Hold 성과
+
+    각 윈도우는 run_backtest(data.iloc[s-n_sigma-1 : s+window])와 같은 결과.
+    시그널은 전체 이력에서 한 번만 계산하고, 첫 시작일부터 한 번 시뮬레이션한
+    기준 경로(바별 상태 체크포인트)를 공유: 윈도우 상태(qty, step, 평단)가
+    기준 경로와 같아지면 이후 자산은 기준 경로 + 현금 차이. 현금 차이 때문에
+    매수 가능 여부가 달라지는 바에서만 다시 직접 시뮬레이션.
+    반환: 윈도우별 DataFrame (start, end, return, bh_return, excess, mdd, bh_mdd, mdd_diff)
+    """
+    first = n_sigma + 1
+    if data is None or len(data) < first + window:
+        return None
+    
+    prices = data[TICKER].values.astype(np.float64)
+    _, buy_locs, sell_locs = compute_signals(prices, n_sigma, buy_mult, sell_mult, features)
+    n = len(prices)
+    
+    # 기준 경로 (바별 상태 체크포인트)
+    ref_cash = np.zeros(n)
+    ref_qty = np.zeros(n, dtype=np.int64)
+    ref_avg = np.zeros(n)
+    ref_step = np.zeros(n, dtype=np.int64)
+    ref_margin = np.full(n, np.nan)
+    cash, qty, avg_price, step = float(seed), 0, 0.0, 0
+    for i in range(first, n):
+        cash, qty, avg_price, step, ref_margin[i] = _sim_step(
+            prices[i], buy_locs[i-1], sell_locs[i-1], seed, weights, cash, qty, avg_price, step)
+        ref_cash[i], ref_qty[i], ref_avg[i], ref_step[i] = cash, qty, avg_price, step
+    ref_value = ref_cash + ref_qty * prices
+    attempts = np.flatnonzero(~np.isnan(ref_margin))
+    attempt_margins = ref_margin[attempts]
+    
+    starts = np.arange(first, n - window + 1, stride)
+    equity = np.empty((len(starts), window))
+    
+    for w, s in enumerate(starts):
+        e = s + window
+        row = equity[w]
+        cash, qty, avg_price, step = float(seed), 0, 0.0, 0
+        i = s
+        while i < e:
+            cash, qty, avg_price, step, _ = _sim_step(
+                prices[i], buy_locs[i-1], sell_locs[i-1], seed, weights, cash, qty, avg_price, step)
+            row[i-s] = cash + qty * prices[i]
+            i += 1
+            if qty != ref_qty[i-1] or step != ref_step[i-1] or avg_price != ref_avg[i-1]:
+                continue
+            
+            # 기준 경로와 합류: 매수 가능 여부가 달라지는 첫 바까지 기준 경로 재사용
+            offset = cash - ref_cash[i-1]
+            lo, hi = np.searchsorted(attempts, [i, e])
+            margins = attempt_margins[lo:hi]
+            flips = np.flatnonzero((margins >= 0) != (margins + offset >= 0))
+            k = attempts[lo + flips[0]] if len(flips) > 0 else e
+            row[i-s:k-s] = ref_value[i:k] + offset
+            if k < e:
+                cash, qty, avg_price, step = ref_cash[k-1] + offset, ref_qty[k-1], ref_avg[k-1], ref_step[k-1]
+            i = k
+    
+    # 윈도우별 지표 (행 단위 벡터 연산)
+    closes = np.lib.stride_tricks.sliding_window_view(prices, window)[starts]
+    strat_return = (equity[:, -1] / seed - 1) * 100
+    bh_return = (closes[:, -1] / closes[:, 0] - 1) * 100
+    mdd = ((equity / np.maximum.accumulate(equity, axis=1)) - 1).min(axis=1) * 100
+    bh_mdd = ((closes / np.maximum.accumulate(closes, axis=1)) - 1).min(axis=1) * 100
+    
+    return pd.DataFrame({
+        "start": data.index[starts],
+        "end": data.index[starts + window - 1],
+        "return": strat_return,
+        "bh_return": bh_return,
+        "excess": strat_return - bh_return,
+        "mdd": mdd,
+        "bh_mdd": bh_mdd,
+        "mdd_diff": mdd - bh_mdd
+    })
+
+def summarize_windows(windows):
+    """롤링 윈도우 결과 분포 요약 (분위수 + σ 전략 우위 비율)"""
+    quantiles = [0.05, 0.25, 0.5, 0.75, 0.95]
+    summary = windows[["excess", "mdd_diff", "return", "bh_return", "mdd", "bh_mdd"]].quantile(quantiles)
+    summary.loc["mean"] = windows[summary.columns].mean()
+    summary.loc["win_rate"] = (windows[summary.columns] > 0).mean() * 100
+    return summary
+
+# ==========================================
+# 부트스트랩 신뢰구간 (정상 블록 부트스트랩)
+# ==========================================
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_CHUNK = 250  # 워커 1개가 처리하는 리샘플 수 (결과는 워커 수와 무관)
+
+# 신뢰구간을 내는 지표: (표시 이름, 지표, 높을수록 좋은지, 단위)
+BOOTSTRAP_METRICS = (
+    ("수익률", "total_return", True, "%"),
+    ("CAGR", "cagr", True, "%"),
+    ("샤프비율", "sharpe", True, ""),
+    ("MDD", "mdd", True, "%"),
+    ("변동성", "volatility", False, "%"),
+    ("승률", "win_rate", True, "%"),
+)
+
+def _block_bootstrap_indices(rng, n, size, block):
+    """정상 블록 부트스트랩 인덱스 (size × n)
+
+    블록 길이는 평균 block의 기하분포, 시작점은 균등, 끝에서 처음으로 순환.
+    """
+    new_block = rng.random((size, n)) < 1 / block
+    new_block[:, 0] = True
+    starts = rng.integers(0, n, (size, n))
+    pos = np.arange(n)
+    last = np.maximum.accumulate(np.where(new_block, pos, 0), axis=1)
+    return (np.take_along_axis(starts, last, axis=1) + pos - last) % n
+
+def _path_metrics(returns, days):
+    """일간 수익률 행렬 (리샘플 × 일) → calculate_metrics와 같은 정의의 지표 배열"""
+    growth = np.cumprod(1 + returns, axis=1)
+    path = np.concatenate([np.ones((len(returns), 1)), growth], axis=1)
+    peak = np.maximum.accumulate(path, axis=1)
+    final = growth[:, -1]
+    cagr = (final ** (252 / days) - 1) * 100
+    volatility = returns.std(axis=1, ddof=1) * np.sqrt(252) * 100
+    sharpe = np.divide(cagr / 100 - RISK_FREE, volatility / 100, out=np.zeros(len(returns)), where=volatility > 0)
+    return {
+        "total_return": (final - 1) * 100,
+        "cagr": cagr,
+        "sharpe": sharpe,
+        "mdd": ((path - peak) / peak * 100).min(axis=1),
+        "volatility": volatility,
+        "win_rate": (returns > 0).mean(axis=1) * 100
+    }
+
+def bootstrap_metrics(bt, n_resamples=BOOTSTRAP_RESAMPLES, block=None, level=0.95, random_seed=0, workers=None):
+    """σ 전략 / Buy & Hold 지표와 차이(σ-B&H)의 부트스트랩 신뢰구간
+
+    두 일간 수익률 계열을 같은 인덱스로 리샘플 (같은 날끼리 짝을 유지하는
+    정상 블록 부트스트랩, 평균 블록 길이 기본 일수^(1/3)). 리샘플은
+    BOOTSTRAP_CHUNK 단위로 나눠 스레드 풀에서 벡터 연산, 청크별 난수는
+    random_seed에서 파생하므로 워커 수와 관계없이 같은 결과.
+    반환: {"metrics": 지표별 DataFrame (점추정, 구간, σ 우위 확률),
+           "scoreboard": 스코어보드 승자 확률 (%), "n_resamples", "block", "level"}
+    """
+    if bt is None or len(bt) < 3:
+        return None
+    if isinstance(bt, pd.DataFrame):
+        bt = BacktestResult.from_frame(bt)
+    
+    returns = _daily_returns(bt.total_value.astype(np.float64))
+    bh_returns = _daily_returns(bt.close.astype(np.float64))
+    days = len(bt)
+    m = len(returns)
+    block = block or max(1, round(m ** (1 / 3)))
+    
+    sizes = [min(BOOTSTRAP_CHUNK, n_resamples - i) for i in range(0, n_resamples, BOOTSTRAP_CHUNK)]
+    seeds = np.random.SeedSequence(random_seed).spawn(len(sizes))
+    
+    def run(seed_seq, size):
+        idx = _block_bootstrap_indices(np.random.default_rng(seed_seq), m, size, block)
+        return _path_metrics(returns[idx], days), _path_metrics(bh_returns[idx], days)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(run, seeds, sizes))
+    
+    keys = [key for _, key, _, _ in BOOTSTRAP_METRICS]
+    strat = {k: np.concatenate([p[0][k] for p in parts]) for k in keys}
+    bh = {k: np.concatenate([p[1][k] for p in parts]) for k in keys}
+    point = _path_metrics(returns[None], days)
+    bh_point = _path_metrics(bh_returns[None], days)
+    
+    q = [(1 - level) / 2, (1 + level) / 2]
+    rows = []
+    for name, key, higher_better, unit in BOOTSTRAP_METRICS:
+        diff = strat[key] - bh[key]
+        lo, hi = np.quantile(strat[key], q)
+        bh_lo, bh_hi = np.quantile(bh[key], q)
+        diff_lo, diff_hi = np.quantile(diff, q)
+        rows.append({
+            "metric": key, "name": name, "unit": unit,
+            "strategy": float(point[key][0]), "strategy_lo": lo, "strategy_hi": hi,
+            "bh": float(bh_point[key][0]), "bh_lo": bh_lo, "bh_hi": bh_hi,
+            "diff": float(point[key][0] - bh_point[key][0]), "diff_lo": diff_lo, "diff_hi": diff_hi,
+            "p_better": float(((diff > 0) if higher_better else (diff < 0)).mean() * 100)
+        })
+    
+    # 리샘플별 스코어보드 승자
+    sigma_wins = sum(((strat[k] > bh[k]) if hb else (strat[k] < bh[k])).astype(int) for _, k, hb in SCOREBOARD)
+    bh_wins = sum(((bh[k] > strat[k]) if hb else (bh[k] < strat[k])).astype(int) for _, k, hb in SCOREBOARD)
+    
+    return {
+        "metrics": pd.DataFrame(rows).set_index("metric"),
+        "scoreboard": {
+            "sigma": float((sigma_wins > bh_wins).mean() * 100),
+            "bh": float((bh_wins > sigma_wins).mean() * 100),
+            "tie": float((sigma_wins == bh_wins).mean() * 100)
+        },
+        "n_resamples": n_resamples,
+        "block": block,
+        "level": level
+    }
+
+# ==========================================
+# 분봉 LOC 체결 시뮬레이션 (메모리 맵 분봉 데이터)
+# ==========================================
+INTRADAY_DIR = "intraday"  # convert_minute_bars 출력 폴더
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+
+def convert_minute_bars(src, out_dir=INTRADAY_DIR, ticker=TICKER, chunk_rows=500_000, time_col=None, close_col="close"):
+    """분봉 CSV/Parquet → 메모리 맵용 바이너리 (ts.bin int64 ns, close.bin float64, meta.json)
+
+    청크 단위로 읽어 이어 쓰므로 원본 전체를 메모리에 올리지 않음.
+    시간은 뉴욕 현지 시각(naive)으로 저장 (tz 정보가 있으면 변환).
+    """
+    if str(src).endswith(".parquet"):
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(src).iter_batches(batch_size=chunk_rows))
+    else:
+        chunks = pd.read_csv(src, chunksize=chunk_rows)
+    
+    os.makedirs(out_dir, exist_ok=True)
+    rows = 0
+    last_ts = None
+    with open(os.path.join(out_dir, "ts.bin"), "wb") as ts_file, open(os.path.join(out_dir, "close.bin"), "wb") as close_file:
+        for chunk in chunks:
+            chunk.columns = [str(c).lower() for c in chunk.columns]
+            if time_col is None:
+                time_col = next(c for c in ("timestamp", "datetime", "date", "time") if c in chunk.columns)
+            times = pd.to_datetime(chunk[time_col])
+            if times.dt.tz is not None:
+                times = times.dt.tz_convert("America/New_York").dt.tz_localize(None)
+            ts = times.values.astype("datetime64[ns]").astype(np.int64)
+            if len(ts) == 0:
+                continue
+            if np.any(np.diff(ts) < 0) or (last_ts is not None and ts[0] < last_ts):
+                raise ValueError("minute bars must be sorted by time")
+            last_ts = ts[-1]
+            ts_file.write(ts.tobytes())
+            close_file.write(chunk[close_col.lower()].values.astype(np.float64).tobytes())
+            rows += len(ts)
+    
+    meta = {"ticker": ticker, "rows": rows, "source": str(src), "tz": "America/New_York"}
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def open_minute_bars(bars_dir=INTRADAY_DIR):
+    """변환된 분봉을 메모리 맵으로 열기 → (ts, close, meta)"""
+    with open(os.path.join(bars_dir, "meta.json"), "r") as f:
+        meta = json.load(f)
+    rows = meta["rows"]
+    ts = np.memmap(os.path.join(bars_dir, "ts.bin"), dtype=np.int64, mode="r", shape=(rows,))
+    close = np.memmap(os.path.join(bars_dir, "close.bin"), dtype=np.float64, mode="r", shape=(rows,))
+    return ts, close, meta
+
+def closing_auction_stats(bars_dir=INTRADAY_DIR, window_minutes=10, chunk_rows=1_000_000):
+    """일별 장 마감 직전 구간 통계 (청크 단위 스트리밍)
+
+    window_minutes: 마지막 분봉 기준 마감 직전 구간 길이
+    반환: 날짜 인덱스 DataFrame
+      close      - 마지막 분봉 종가
+      disp       - 구간 내 분봉 종가의 종가 대비 표준편차 (마감가 불확실성)
+      low / high - 구간 내 최저 / 최고 (종가 대비 비율)
+      minutes    - 구간 분봉 수
+    """
+    ts, close, meta = open_minute_bars(bars_dir)
+    window_ns = window_minutes * NS_PER_MINUTE
+    rows = []
+    carry_ts = ts[:0]
+    carry_close = close[:0]
+    
+    for lo in range(0, meta["rows"], chunk_rows):
+        hi = min(lo + chunk_rows, meta["rows"])
+        chunk_ts = np.concatenate([carry_ts, ts[lo:hi]])
+        chunk_close = np.concatenate([carry_close, close[lo:hi]])
+        days = chunk_ts // NS_PER_DAY
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(days)) + 1, [len(days)]])
+        
+        # 마지막 날은 다음 청크로 이어질 수 있으므로 보류 (마지막 청크 제외)
+        complete = len(bounds) - 1 if hi == meta["rows"] else len(bounds) - 2
+        for d in range(complete):
+            day_ts = chunk_ts[bounds[d]:bounds[d+1]]
+            day_close = chunk_close[bounds[d]:bounds[d+1]]
+            final = day_close[-1]
+            in_window = day_close[day_ts >= day_ts[-1] - window_ns] / final - 1
+            rows.append((days[bounds[d]], final, in_window.std(), in_window.min(), in_window.max(), len(in_window)))
+        carry_ts = chunk_ts[bounds[complete]:]
+        carry_close = chunk_close[bounds[complete]:]
+    
+    stats = pd.DataFrame(rows, columns=["day", "close", "disp", "low", "high", "minutes"])
+    stats.index = pd.to_datetime(stats.pop("day") * NS_PER_DAY)
+    return stats
+
+def _norm_cdf(x):
+    return 0.5 * (1 + np.vectorize(math.erf)(np.asarray(x, dtype=np.float64) / math.sqrt(2)))
+
+def run_intraday_backtest(data, auction_stats, n_paths=200, random_seed=0, seed=37000, n_sigma=N_SIGMA,
+                          buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS, near=1.0, features=None):
+    """분봉 기반 마감가 불확실성을 반영한 LOC 체결 시뮬레이션
+
+    일봉 백테스트는 종가가 LOC 가격을 넘는지로 체결을 확정하지만, 실제 마감가는
+    마감 직전 구간의 가격 분포(disp) 안에서 찍힘. 날짜별 disp로
+      - fills: 일봉 LOC 가격 기준 매수/매도 체결 확률 (종가 ~ N(close, close×disp)),
+               |종가 - LOC| < near × close × disp 이면 near_threshold
+      - paths: 종가를 disp만큼 흔든 n_paths개 경로의 run_backtest 성과 분포
+    분봉이 없는 날의 disp는 전체 중앙값 사용.
+    """
+    base = run_backtest(data, seed, n_sigma, buy_mult, sell_mult, weights, features)
+    if base is None:
+        return None
+    
+    days = data.index.normalize()
+    disp = auction_stats["disp"].reindex(days).values
+    if np.all(np.isnan(disp)):
+        raise ValueError("no minute bars overlap the daily data")
+    disp = np.where(np.isnan(disp), np.nanmedian(disp), disp)
+    
+    # 일봉 백테스트의 LOC 가격 기준 체결 확률
+    start = len(data) - len(base)
+    scale = np.maximum(base.close * disp[start:], 1e-12)
+    z_buy = (base.buy_loc - base.close) / scale
+    z_sell = (base.close - base.sell_loc) / scale
+    fills = pd.DataFrame({
+        "date": base.date,
+        "close": base.close,
+        "buy_loc": base.buy_loc,
+        "sell_loc": base.sell_loc,
+        "disp": disp[start:],
+        "p_buy": _norm_cdf(z_buy),
+        "p_sell": _norm_cdf(z_sell),
+        "near_threshold": (np.abs(z_buy) < near) | (np.abs(z_sell) < near)
+    })
+    
+    # 마감가 경로 시뮬레이션
+    rng = np.random.default_rng(random_seed)
+    prices = data[TICKER].values.astype(np.float64)
+    paths = []
+    for _ in range(n_paths):
+        path = data.copy()
+        path[TICKER] = prices * (1 + disp * rng.standard_normal(len(prices)))
+        metrics = calculate_metrics(run_backtest(path, seed, n_sigma, buy_mult, sell_mult, weights), seed)
+        paths.append({k: metrics[k] for k in ("total_return", "mdd", "sharpe", "buy_count", "sell_count")})
+    
+    return {"base": base, "base_metrics": calculate_metrics(base, seed), "fills": fills, "paths": pd.DataFrame(paths)}
+
+# ==========================================
+# 결과 내보내기 / 불러오기 (Arrow IPC / Parquet)
+# ==========================================
+RESULT_META_KEY = b"upro_atm"
+
+def data_snapshot_id(data):
+    """데이터 스냅샷 식별자 (날짜 + 가격 해시)"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data, index=True).values.tobytes()).hexdigest()
+    return digest[:16]
+
+def snapshot_meta(data):
+    if data is None or len(data) == 0:
+        return None
+    return {
+        "id": data_snapshot_id(data),
+        "start": data.index[0].strftime("%Y-%m-%d"),
+        "end": data.index[-1].strftime("%Y-%m-%d"),
+        "rows": len(data)
+    }
+
+def json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return str(value)
+
+def save_results(path, obj, params=None, data=None, metrics=None, fmt=None):
+    """백테스트 결과 저장
+
+    obj: BacktestResult / 성과 지표 dict / 스윕 DataFrame
+    fmt: "parquet" / "arrow" (생략 시 확장자로 판단, .parquet 외에는 Arrow IPC)
+    path는 파일 경로 또는 file-like 객체. 파라미터와 데이터 스냅샷 정보는
+    스키마 메타데이터에 JSON으로 저장.
+    """
+    import pyarrow as pa
+    
+    if isinstance(obj, BacktestResult):
+        kind = "backtest"
+        table = pa.table({name: getattr(obj, name) for name, _ in BacktestResult.COLUMNS})
+    elif isinstance(obj, dict):
+        kind = "metrics"
+        table = pa.Table.from_pandas(pd.DataFrame([obj]), preserve_index=False)
+        metrics = obj
+    else:
+        kind = "sweep"
+        table = pa.Table.from_pandas(obj, preserve_index=False)
+    
+    meta = {
+        "kind": kind,
+        "ticker": TICKER,
+        "params": params or {},
+        "snapshot": snapshot_meta(data),
+        "metrics": metrics,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        RESULT_META_KEY: json.dumps(meta, ensure_ascii=False, default=json_default)
+    })
+    
+    if fmt is None:
+        fmt = "parquet" if str(path).endswith(".parquet") else "arrow"
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+    return meta
+
+def load_results(path):
+    """save_results 파일 불러오기 → (객체, 메타데이터)
+
+    Arrow IPC 파일은 메모리 맵으로 열어 BacktestResult 배열을 복사 없이
+    (읽기 전용) 반환.
+    """
+    import pyarrow as pa
+    
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    
+    meta = json.loads(table.schema.metadata[RESULT_META_KEY])
+    if meta["kind"] == "backtest":
+        table = table.combine_chunks()
+        columns = {name: table.column(name).chunk(0).to_numpy(zero_copy_only=False) for name, _ in BacktestResult.COLUMNS}
+        return BacktestResult.from_columns(columns), meta
+    if meta["kind"] == "metrics":
+        return table.to_pandas().iloc[0].to_dict(), meta
+    return table.to_pandas(), meta
+
+# ==========================================
+# 결과 캐시 (메모리 한도 + LRU)
+# ==========================================
+RESULT_CACHE_BYTES = 256 * 1024 * 1024  # 백테스트 결과 캐시 한도
+
+def _sizeof(value):
+    """캐시 항목 메모리 크기 추정 (bytes)"""
+    if isinstance(value, (BacktestResult, PortfolioResult)):
+        return value.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+def _freeze(value):
+    """캐시된 배열을 읽기 전용으로 (복사 없이 공유)"""
+    if isinstance(value, BacktestResult):
+        for name, _ in BacktestResult.COLUMNS:
+            value[name].flags.writeable = False
+    elif isinstance(value, PortfolioResult):
+        for array in value.arrays():
+            array.flags.writeable = False
+    elif isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    return value
+
+class ResultCache:
+    """바이트 한도가 있는 LRU 결과 캐시
+
+    st.cache_data와 달리 pickle/복사 없이 객체를 그대로 반환 (NumPy 배열은
+    읽기 전용). 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거하고,
+    한도보다 큰 항목은 저장하지 않음.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        nbytes = _sizeof(value)
+        if nbytes > self.max_bytes:
+            return value
+        _freeze(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """캐시 조회, 없으면 compute() 결과 저장 후 반환"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """hit/miss/크기 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total * 100 if total > 0 else 0,
+                "evictions": self.evictions
+            }
+
+def cached_sigma_features(cache, data, columns=TICKER, max_window=SIGMA_MAX_WINDOW):
+    """데이터 스냅샷별 σ 특징 테이블 (rolling_sigma_table, cache에 저장)
+
+    columns가 종목 하나면 (윈도우, 바), 여러 개면 (윈도우, 바, 종목).
+    """
+    if data is None:
+        return None
+    if not isinstance(columns, str):
+        columns = list(columns)
+    key = ("sigma", data_snapshot_id(data), columns if isinstance(columns, str) else tuple(columns), max_window)
+    return cache.get_or_compute(key, lambda: rolling_sigma_table(data[columns].values, max_window))
+
+def cached_backtest(cache, data, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS):
+    """백테스트 + 성과 지표 (데이터 스냅샷 + 파라미터별, cache에 저장) → (BacktestResult, metrics)"""
+    if data is None:
+        return None, {}
+    key = ("backtest", data_snapshot_id(data), seed, n_sigma, buy_mult, sell_mult, tuple(weights))
+    
+    def compute():
+        bt = run_backtest(data, seed, n_sigma, buy_mult, sell_mult, weights, cached_sigma_features(cache, data))
+        return bt, calculate_metrics(bt, seed)
+    
+    return cache.get_or_compute(key, compute)
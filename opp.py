@@ -1,10 +1,45 @@
+import time
+_SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
+from streamlit.logger import get_logger
 from datetime import datetime, timedelta
-import numpy as np
 import streamlit.components.v1 as components
-import json
-import requests
+from store import load_data, save_data, TradeStore
+import io
+import os
+
+# ==========================================
+# 시작 시간 측정 (단계별 예산)
+# ==========================================
+# 콜드 프로세스 실측치 (file 공급자, 1 CPU) + 여유. tab은 시장 데이터 조회 포함이라
+# 네트워크 공급자를 쓰면 조회 시간만큼 초과로 표시됨
+STARTUP_BUDGET_MS = {
+    "imports": 20,    # 표준 라이브러리 + streamlit (~3ms)
+    "page": 150,      # 첫 set_page_config + CSS (~80-120ms, 대부분 streamlit 초기화)
+    "state": 20,      # 계좌 파일 + 세션 상태 (~1ms)
+    "shell": 20,      # 헤더 + 탭 골격 (~1ms)
+    "engine": 450,    # numpy / pandas / engine import (~280-370ms)
+    "tab": 150,       # 선택된 탭 (~30-65ms)
+    "footer": 20
+}
+_phase_marks = [("start", _SCRIPT_STARTED)]
+LOGGER = get_logger(__name__)
+
+def mark_phase(name):
+    """실행 단계 종료 시점 기록"""
+    _phase_marks.append((name, time.perf_counter()))
+
+def startup_report():
+    """단계별 소요 시간 (ms) 및 예산 초과 여부"""
+    rows = []
+    for (_, prev), (name, now) in zip(_phase_marks, _phase_marks[1:]):
+        ms = (now - prev) * 1000
+        budget = STARTUP_BUDGET_MS.get(name)
+        rows.append({"phase": name, "ms": round(ms, 1), "budget_ms": budget, "over": budget is not None and ms > budget})
+    return rows
+
+mark_phase("imports")
 
 # ==========================================
 # 페이지 설정
@@ -63,284 +98,7 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ==========================================
-# 전략 파라미터 (고정)
-# ==========================================
-TICKER = "UPRO"
-N_SIGMA = 2
-BUY_MULT = 0.85
-SELL_MULT = 0.35
-N_SPLIT = 3
-WEIGHTS = [1, 1, 2]  # 1:1:2 비율
-
-# ==========================================
-# 데이터 저장/로드 함수 (JSON 파일 기반)
-# ==========================================
-DATA_FILE = "lsw_loc_data.json"
-
-def load_data():
-    """저장된 데이터 로드"""
-    try:
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {
-            "seed": 37000.0,
-            "qty": 0,
-            "avg": 0.0,
-            "step": 1,
-            "cash": 37000.0,
-            "trades": [],
-            "daily_records": []
-        }
-
-def save_data(data):
-    """데이터 저장"""
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-
-# ==========================================
-# 시장 데이터 수집
-# ==========================================
-@st.cache_data(ttl=600)
-def get_market_data(days=60):
-    """시장 데이터 수집 (yfinance + fallback)"""
-    try:
-        import yfinance as yf
-        # yfinance period 문자열 변환
-        if days <= 30:
-            period = "1mo"
-        elif days <= 90:
-            period = "3mo"
-        elif days <= 180:
-            period = "6mo"
-        elif days <= 365:
-            period = "1y"
-        else:
-            period = "2y"
-        
-        raw = yf.download([TICKER, "USDKRW=X"], period=period, progress=False, timeout=15)['Close']
-        if raw is not None and not raw.empty and len(raw) >= 2:
-            return raw.dropna()
-    except:
-        pass
-    
-    try:
-        import time
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        end = int(time.time())
-        start = end - (days * 24 * 60 * 60)
-        data_dict = {}
-        
-        for ticker in [TICKER, "USDKRW=X"]:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?period1={start}&period2={end}&interval=1d"
-            resp = requests.get(url, headers=headers, timeout=15)
-            if resp.status_code == 200:
-                result = resp.json()['chart']['result'][0]
-                dates = pd.to_datetime(result['timestamp'], unit='s')
-                data_dict[ticker] = pd.Series(result['indicators']['quote'][0]['close'], index=dates)
-        
-        if len(data_dict) == 2:
-            return pd.DataFrame(data_dict).dropna()
-    except:
-        pass
-    
-    return None
-
-@st.cache_data(ttl=3600)
-def get_backtest_data(days=365):
-    """백테스팅용 장기 데이터 수집"""
-    return get_market_data(days)
-
-# ==========================================
-# 백테스팅 함수
-# ==========================================
-def run_backtest(data, seed=37000, n_sigma=2, buy_mult=0.85, sell_mult=0.35, weights=[1,1,2]):
-    """백테스팅 실행"""
-    if data is None or len(data) < n_sigma + 2:
-        return None
-    
-    prices = data[TICKER].values
-    dates = data.index
-    
-    # 초기 상태
-    cash = seed
-    qty = 0
-    avg_price = 0
-    step = 0  # 0: 포지션 없음, 1~3: 매수 회차
-    
-    records = []
-    
-    for i in range(n_sigma, len(prices)):
-        close = prices[i]
-        prev_close = prices[i-1]
-        
-        # 변동성 계산 (n일 수익률 표준편차)
-        returns = np.diff(prices[max(0,i-n_sigma):i+1]) / prices[max(0,i-n_sigma):i]
-        sigma = np.std(returns, ddof=0) if len(returns) >= n_sigma else 0
-        
-        # LOC 가격 계산
-        buy_loc = prev_close * (1 + buy_mult * sigma)
-        sell_loc = prev_close * (1 + sell_mult * sigma)
-        
-        # 매수/매도 신호
-        buy_signal = close <= buy_loc and step < len(weights)
-        sell_signal = close >= sell_loc and qty > 0
-        
-        # 거래 실행
-        trade_type = None
-        trade_qty = 0
-        trade_price = 0
-        
-        if sell_signal:
-            # 매도 (전량)
-            trade_type = "SELL"
-            trade_qty = qty
-            trade_price = close
-            cash += qty * close
-            qty = 0
-            avg_price = 0
-            step = 0
-        
-        if buy_signal and step < len(weights):
-            # 매수
-            target_pct = weights[step] / sum(weights)
-            target_amount = seed * target_pct
-            buy_qty = int(target_amount / close)
-            
-            if buy_qty > 0 and cash >= buy_qty * close:
-                trade_type = "BUY"
-                trade_qty = buy_qty
-                trade_price = close
-                
-                # 평균단가 계산
-                total_value = qty * avg_price + buy_qty * close
-                qty += buy_qty
-                avg_price = total_value / qty if qty > 0 else 0
-                cash -= buy_qty * close
-                step += 1
-        
-        # 자산 계산
-        total_value = cash + qty * close
-        pnl_pct = (total_value / seed - 1) * 100 if seed > 0 else 0
-        
-        records.append({
-            "date": dates[i],
-            "close": close,
-            "buy_loc": buy_loc,
-            "sell_loc": sell_loc,
-            "sigma": sigma,
-            "cash": cash,
-            "qty": qty,
-            "avg_price": avg_price,
-            "total_value": total_value,
-            "pnl_pct": pnl_pct,
-            "trade_type": trade_type,
-            "trade_qty": trade_qty,
-            "trade_price": trade_price,
-            "step": step
-        })
-    
-    return pd.DataFrame(records)
-
-# ==========================================
-# 성과 지표 계산
-# ==========================================
-def calculate_metrics(bt_df, seed):
-    """백테스트 성과 지표 계산 (확장)"""
-    if bt_df is None or len(bt_df) == 0:
-        return {}
-    
-    final_value = bt_df['total_value'].iloc[-1]
-    total_return = (final_value / seed - 1) * 100
-    
-    # MDD 계산
-    peak = bt_df['total_value'].expanding().max()
-    drawdown = (bt_df['total_value'] - peak) / peak * 100
-    mdd = drawdown.min()
-    
-    # 거래 횟수
-    buy_count = len(bt_df[bt_df['trade_type'] == 'BUY'])
-    sell_count = len(bt_df[bt_df['trade_type'] == 'SELL'])
-    
-    # Buy & Hold
-    first_close = bt_df['close'].iloc[0]
-    last_close = bt_df['close'].iloc[-1]
-    bh_return = (last_close / first_close - 1) * 100
-    bh_final = seed * (last_close / first_close)
-    
-    # Buy & Hold MDD
-    bh_values = seed * (bt_df['close'] / first_close)
-    bh_peak = bh_values.expanding().max()
-    bh_drawdown = (bh_values - bh_peak) / bh_peak * 100
-    bh_mdd = bh_drawdown.min()
-    
-    # 일 수 계산
-    days = len(bt_df)
-    years = days / 252  # 거래일 기준
-    
-    # CAGR 계산 (연환산 수익률)
-    if years > 0:
-        cagr = ((final_value / seed) ** (1 / years) - 1) * 100
-        bh_cagr = ((bh_final / seed) ** (1 / years) - 1) * 100
-    else:
-        cagr = total_return
-        bh_cagr = bh_return
-    
-    # 일간 수익률 계산
-    daily_returns = bt_df['total_value'].pct_change().dropna()
-    bh_daily_returns = bt_df['close'].pct_change().dropna()
-    
-    # 변동성 (연환산)
-    volatility = daily_returns.std() * np.sqrt(252) * 100
-    bh_volatility = bh_daily_returns.std() * np.sqrt(252) * 100
-    
-    # 샤프 비율 (무위험 이자율 4% 가정)
-    risk_free = 0.04
-    if volatility > 0:
-        sharpe = (cagr / 100 - risk_free) / (volatility / 100)
-    else:
-        sharpe = 0
-    
-    if bh_volatility > 0:
-        bh_sharpe = (bh_cagr / 100 - risk_free) / (bh_volatility / 100)
-    else:
-        bh_sharpe = 0
-    
-    # 승률 계산 (양수 수익 일 비율)
-    win_rate = (daily_returns > 0).sum() / len(daily_returns) * 100 if len(daily_returns) > 0 else 0
-    bh_win_rate = (bh_daily_returns > 0).sum() / len(bh_daily_returns) * 100 if len(bh_daily_returns) > 0 else 0
-    
-    # 최고/최저 일간 수익률
-    max_daily = daily_returns.max() * 100 if len(daily_returns) > 0 else 0
-    min_daily = daily_returns.min() * 100 if len(daily_returns) > 0 else 0
-    bh_max_daily = bh_daily_returns.max() * 100 if len(bh_daily_returns) > 0 else 0
-    bh_min_daily = bh_daily_returns.min() * 100 if len(bh_daily_returns) > 0 else 0
-    
-    return {
-        "initial": seed,
-        "final": final_value,
-        "total_return": total_return,
-        "mdd": mdd,
-        "cagr": cagr,
-        "volatility": volatility,
-        "sharpe": sharpe,
-        "win_rate": win_rate,
-        "max_daily": max_daily,
-        "min_daily": min_daily,
-        "buy_count": buy_count,
-        "sell_count": sell_count,
-        "days": days,
-        "bh_final": bh_final,
-        "bh_return": bh_return,
-        "bh_mdd": bh_mdd,
-        "bh_cagr": bh_cagr,
-        "bh_volatility": bh_volatility,
-        "bh_sharpe": bh_sharpe,
-        "bh_win_rate": bh_win_rate,
-        "bh_max_daily": bh_max_daily,
-        "bh_min_daily": bh_min_daily
-    }
+mark_phase("page")
 
 # ==========================================
 # 메인 앱
@@ -356,6 +114,19 @@ if 'avg' not in st.session_state: st.session_state.avg = saved_data.get('avg', 0
 if 'step' not in st.session_state: st.session_state.step = saved_data.get('step', 1)
 if 'cash' not in st.session_state: st.session_state.cash = saved_data.get('cash', 37000.0)
 if 'trades' not in st.session_state: st.session_state.trades = saved_data.get('trades', [])
+if 'trade_store' not in st.session_state: st.session_state.trade_store = TradeStore(st.session_state.trades)
+
+# 닫힌 탭의 위젯은 렌더링되지 않아 Streamlit이 상태를 지우므로, 매 실행마다 다시
+# 대입해 탭을 오가도 값이 유지되게 함 (이 위젯들은 value= 없이 session_state로만 기본값 지정)
+PERSISTENT_WIDGETS = (
+    "bt_period", "bt_seed", "bt_n_sigma", "bt_buy_mult", "bt_sell_mult", "bt_weights",
+    "bt_bootstrap", "bt_rolling", "bt_intraday", "bt_portfolio", "pf_tickers", "pf_priority",
+    "hist_start", "hist_end", "hist_page"
+)
+for _key in PERSISTENT_WIDGETS:
+    if _key in st.session_state: st.session_state[_key] = st.session_state[_key]
+
+mark_phase("state")
 
 # ==========================================
 # 헤더
@@ -373,17 +144,183 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ==========================================
-# 탭 구성
+# 탭 구성 (골격만 먼저 전송)
+# ==========================================
+tab1, tab2, tab3 = st.tabs(["📌 오늘의 주문", "📊 백테스팅", "📝 거래 기록"], key="main_tab", on_change="rerun")
+mark_phase("shell")
+
+# ==========================================
+# 엔진 / 데이터 라이브러리 (탭 골격을 보낸 뒤 import - 콜드 스타트)
+# ==========================================
+import pandas as pd
+from engine import (
+    TICKER, N_SIGMA, BUY_MULT, SELL_MULT, WEIGHTS, PORTFOLIO_TICKERS, PORTFOLIO_PRIORITIES, SCOREBOARD,
+    SIGMA_MAX_WINDOW, BOOTSTRAP_RESAMPLES, INTRADAY_DIR, TRADE_BUY, TRADE_SELL, parse_weights, today_orders,
+    run_portfolio_backtest, portfolio_metrics, rolling_window_analysis, summarize_windows, bootstrap_metrics,
+    closing_auction_stats, run_intraday_backtest, data_snapshot_id, save_results, ResultCache,
+    cached_sigma_features, cached_backtest
+)
+from providers import DEFAULT_TICKERS, market_provider_config, make_providers, fetch_market_data
+import api
+
+mark_phase("engine")
+
+# ==========================================
+# 시장 데이터 수집
+# ==========================================
+@st.cache_resource
+def get_market_providers(config):
+    """설정별 공급자 목록 (프로세스 공용, file 공급자는 파일을 한 번만 읽음)"""
+    return make_providers(config)
+
+def simulate_market_latency():
+    """첫 공급자의 응답 지연 (캐시 밖에서 호출 - file 공급자 지연이 캐시 적중 때도 적용되도록)"""
+    providers = get_market_providers(market_provider_config())
+    if providers:
+        providers[0].simulate_latency()
+
+@st.cache_data(ttl=600)
+def _load_market_data(days, tickers, config):
+    tickers = list(tickers) if tickers else list(DEFAULT_TICKERS)
+    return fetch_market_data(get_market_providers(config), tickers, days, simulate_latency=False)
+
+def get_market_data(days=60, tickers=None):
+    """시장 데이터 수집 (설정된 공급자를 순서대로 시도, 10분 캐시)"""
+    simulate_market_latency()
+    return _load_market_data(days, tuple(tickers) if tickers else None, market_provider_config())
+
+@st.cache_data(ttl=3600)
+def _load_backtest_data(days, config):
+    return _load_market_data(days, None, config)
+
+def get_backtest_data(days=365):
+    """백테스팅용 장기 데이터 수집 (1시간 캐시)"""
+    simulate_market_latency()
+    return _load_backtest_data(days, market_provider_config())
+
+@st.cache_resource
+def get_result_cache():
+    """프로세스 공용 결과 캐시"""
+    return ResultCache()
+
+def get_sigma_features(data, columns=TICKER, max_window=SIGMA_MAX_WINDOW):
+    """데이터 스냅샷별 σ 특징 테이블 (앱 결과 캐시 공유)"""
+    return cached_sigma_features(get_result_cache(), data, columns, max_window)
+
+def get_backtest(data, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS):
+    """백테스트 + 성과 지표 (앱 결과 캐시) → (BacktestResult, metrics)"""
+    return cached_backtest(get_result_cache(), data, seed, n_sigma, buy_mult, sell_mult, weights)
+
+def get_bootstrap(data, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS,
+                  n_resamples=BOOTSTRAP_RESAMPLES, random_seed=0):
+    """부트스트랩 신뢰구간 (데이터 스냅샷 + 파라미터별 캐시)"""
+    if data is None:
+        return None
+    key = ("bootstrap", data_snapshot_id(data), seed, n_sigma, buy_mult, sell_mult, tuple(weights), n_resamples, random_seed)
+    bt, _ = get_backtest(data, seed, n_sigma, buy_mult, sell_mult, weights)
+    return get_result_cache().get_or_compute(
+        key, lambda: bootstrap_metrics(bt, n_resamples, random_seed=random_seed))
+
+def get_intraday_backtest(data, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS):
+    """분봉 체결 시뮬레이션 (데이터 스냅샷 + 분봉 파일 + 파라미터별 캐시)"""
+    meta_path = os.path.join(INTRADAY_DIR, "meta.json")
+    key = ("intraday", data_snapshot_id(data), os.stat(meta_path).st_mtime_ns, seed, n_sigma, buy_mult, sell_mult, tuple(weights))
+    return get_result_cache().get_or_compute(
+        key, lambda: run_intraday_backtest(data, closing_auction_stats(), seed=seed, n_sigma=n_sigma,
+                                           buy_mult=buy_mult, sell_mult=sell_mult, weights=weights,
+                                           features=get_sigma_features(data)))
+
+def get_rolling_windows(data, window=252, seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS):
+    """롤링 윈도우 분석 (데이터 스냅샷 + 파라미터별 캐시)"""
+    if data is None:
+        return None
+    key = ("rolling", data_snapshot_id(data), window, seed, n_sigma, buy_mult, sell_mult, tuple(weights))
+    return get_result_cache().get_or_compute(
+        key, lambda: rolling_window_analysis(data, window, seed, n_sigma, buy_mult, sell_mult, weights,
+                                             features=get_sigma_features(data)))
+
+def get_portfolio_backtest(data, tickers, priority="deepest", seed=37000, n_sigma=N_SIGMA, buy_mult=BUY_MULT, sell_mult=SELL_MULT, weights=WEIGHTS):
+    """멀티 티커 포트폴리오 백테스트 (데이터 스냅샷 + 종목 + 파라미터별 캐시)"""
+    if data is None:
+        return None
+    key = ("portfolio", data_snapshot_id(data), tuple(tickers), priority, seed, n_sigma, buy_mult, sell_mult, tuple(weights))
+    return get_result_cache().get_or_compute(
+        key, lambda: run_portfolio_backtest(data, tickers, seed, n_sigma, buy_mult, sell_mult, weights, priority=priority,
+                                            features=get_sigma_features(data, tickers)))
+
+# ==========================================
+# What-if 파라미터
 # ==========================================
-tab1, tab2, tab3 = st.tabs(["📌 오늘의 주문", "📊 백테스팅", "📝 거래 기록"])
+BACKTEST_DEFAULTS = {
+    "bt_seed": 37000.0,
+    "bt_n_sigma": N_SIGMA,
+    "bt_buy_mult": BUY_MULT,
+    "bt_sell_mult": SELL_MULT,
+    "bt_weights": ":".join(str(w) for w in WEIGHTS)
+}
+
+def init_backtest_params():
+    """What-if 위젯 기본값은 session_state에서만 (value= 와 중복 지정하지 않음)"""
+    for key, value in BACKTEST_DEFAULTS.items():
+        if key not in st.session_state: st.session_state[key] = value
+
+def reset_backtest_params():
+    """What-if 파라미터를 기본값으로"""
+    for key, value in BACKTEST_DEFAULTS.items():
+        st.session_state[key] = value
 
-# 시장 데이터 가져오기
-data = get_market_data(60)
+PARAM_LABELS = {
+    "days": lambda v: "6개월" if v == 180 else "1년" if v == 365 else f"{v}일",
+    "window": lambda v: f"{v}일 구간",
+    "tickers": lambda v: "/".join(v),
+    "priority": lambda v: {"deepest": "하락폭 우선", "order": "선택 순서", "lowest_step": "회차 적은 종목 우선"}.get(v, v),
+    "seed": lambda v: f"${v:,.0f}",
+    "n_sigma": lambda v: f"σ {v}일",
+    "buy_mult": lambda v: f"매수 {v:.2f}",
+    "sell_mult": lambda v: f"매도 {v:.2f}",
+    "weights": lambda v: ":".join(str(w) for w in v),
+}
+
+def accept_params(key, params):
+    """다시 계산 버튼 콜백 - 실행 전에 파라미터를 바꿔 이전 결과 라벨이 남지 않게"""
+    st.session_state[key] = params
+
+def run_on_demand(section, params):
+    """무거운 분석 섹션에 쓸 파라미터
+
+    처음 켤 때는 현재 파라미터. 이후 파라미터가 바뀌면 마지막으로 계산한 파라미터를
+    그대로 돌려줘 (결과 캐시 적중) 그 결과를 라벨과 함께 계속 보여주고, 버튼을 눌러야
+    현재 파라미터로 다시 계산.
+    """
+    key = f"{section}_params"
+    shown = st.session_state.get(key)
+    if shown is not None and shown != params:
+        note, action = st.columns([3, 1])
+        with note:
+            st.caption("이전 파라미터 결과: " + " · ".join(PARAM_LABELS[k](v) for k, v in shown.items()))
+        with action:
+            st.button("🔄 현재 파라미터로 계산", use_container_width=True, key=f"{section}_run",
+                      on_click=accept_params, args=(key, params))
+        return dict(shown)
+    st.session_state[key] = params
+    return dict(params)
+
+# ==========================================
+# 로컬 JSON API (python -m api 로 따로 실행 중이면 포트가 사용 중이라 건너뜀)
+# ==========================================
+@st.cache_resource
+def start_api_server(port):
+    """앱 데이터 캐시를 쓰는 API 서버를 포트별로 한 번만 시작 (백그라운드 스레드)"""
+    return api.start_api_server(api.ApiContext(get_market_data, get_backtest_data, get_result_cache()), port)
+
+start_api_server(api.api_port())
 
 # ==========================================
 # TAB 1: 오늘의 주문 (기존 기능)
 # ==========================================
-with tab1:
+@st.fragment
+def render_orders_tab():
+    """오늘의 주문 탭 (탭 안의 입력은 이 탭만 다시 실행)"""
     st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">⚙️ 계좌 설정</div>', unsafe_allow_html=True)
     
     c1, c2 = st.columns(2)
@@ -400,28 +337,24 @@ with tab1:
     st.session_state.avg = avg
     st.session_state.step = step
     
+    # 시장 데이터 가져오기 (계좌 설정 입력을 먼저 그린 뒤)
+    with st.spinner("시장 데이터를 불러오는 중..."):
+        data = get_market_data(60)
+    
     if data is not None and len(data) >= 2:
-        last_close = float(data[TICKER].iloc[-1])
-        prev_close = float(data[TICKER].iloc[-2])
-        rate = float(data['USDKRW=X'].iloc[-1])
-        change_pct = (last_close - prev_close) / prev_close * 100
-        
-        used_cash = qty * avg
-        pnl_usd = (last_close - avg) * qty if qty > 0 else 0
-        pnl_krw = pnl_usd * rate
-        pnl_pct = (pnl_usd / used_cash * 100) if used_cash > 0 else 0
-        
-        # 변동성 계산
-        returns = data[TICKER].pct_change().dropna()
-        sigma = returns.tail(N_SIGMA).std(ddof=0) if len(returns) >= N_SIGMA else 0
-        
-        buy_loc = last_close * (1 + BUY_MULT * sigma)
-        sell_loc = last_close * (1 + SELL_MULT * sigma)
-        
-        target = seed * (WEIGHTS[step-1] / sum(WEIGHTS))
-        remaining = seed - used_cash
-        buy_qty = int(min(target, remaining) / buy_loc) if buy_loc > 0 else 0
-        progress = (used_cash / seed * 100) if seed > 0 else 0
+        order = today_orders(data, seed, qty, avg, step, features=get_sigma_features(data))
+        last_close = order['close']
+        rate = order['rate']
+        change_pct = order['change_pct']
+        used_cash = order['used_cash']
+        pnl_krw = order['pnl_krw']
+        pnl_pct = order['pnl_pct']
+        sigma = order['sigma']
+        buy_loc = order['buy_loc']
+        sell_loc = order['sell_loc']
+        remaining = order['remaining']
+        buy_qty = order['buy_qty']
+        progress = order['progress']
 
         # 수익 효과
         if pnl_krw >= 100000:
@@ -574,7 +507,7 @@ with tab1:
                     "qty": buy_qty,
                     "step": step
                 }
-                st.session_state.trades.append(trade)
+                st.session_state.trade_store.append(trade)
                 
                 # 포지션 업데이트
                 new_qty = st.session_state.qty + buy_qty
@@ -604,7 +537,7 @@ with tab1:
                         "qty": qty,
                         "step": 0
                     }
-                    st.session_state.trades.append(trade)
+                    st.session_state.trade_store.append(trade)
                     
                     # 포지션 리셋
                     st.session_state.qty = 0
@@ -636,41 +569,71 @@ with tab1:
 # ==========================================
 # TAB 2: 백테스팅
 # ==========================================
-with tab2:
+@st.fragment
+def render_backtest_tab():
+    """백테스팅 탭"""
     st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">📊 백테스팅 설정</div>', unsafe_allow_html=True)
     
     # 기간 선택
+    if "bt_period" not in st.session_state: st.session_state.bt_period = "1년"
     period_col1, period_col2 = st.columns([1, 3])
     with period_col1:
         bt_period = st.selectbox(
             "백테스트 기간",
             options=["6개월", "1년"],
-            index=1,
             key="bt_period"
         )
     
     # 기간에 따른 일수 설정
     bt_days = 180 if bt_period == "6개월" else 365
     
+    # What-if 파라미터 (변경 시 이 탭만 다시 계산, 결과는 파라미터별 캐시)
+    init_backtest_params()
+    with st.expander("🎛️ 전략 파라미터 (What-if)"):
+        w1, w2, w3 = st.columns(3)
+        with w1:
+            bt_seed = st.number_input("투자 원금 ($)", min_value=1000.0, step=1000.0, key="bt_seed")
+            bt_n_sigma = st.slider("σ 기간 (일)", min_value=1, max_value=30, key="bt_n_sigma")
+        with w2:
+            bt_buy_mult = st.slider("매수 배수", min_value=-2.0, max_value=2.0, step=0.05, key="bt_buy_mult")
+            bt_sell_mult = st.slider("매도 배수", min_value=-2.0, max_value=2.0, step=0.05, key="bt_sell_mult")
+        with w3:
+            bt_weights_text = st.text_input("회차 비중", key="bt_weights")
+            st.button("↺ 기본값", use_container_width=True, key="bt_reset", on_click=reset_backtest_params)
+        
+        bt_weights = parse_weights(bt_weights_text)
+        if bt_weights is None:
+            st.warning(f"⚠️ 회차 비중 형식이 올바르지 않아 기본값({':'.join(str(w) for w in WEIGHTS)})을 사용합니다")
+            bt_weights = WEIGHTS
+    
+    bt_params = {
+        "seed": bt_seed,
+        "n_sigma": bt_n_sigma,
+        "buy_mult": bt_buy_mult,
+        "sell_mult": bt_sell_mult,
+        "weights": bt_weights
+    }
+    
     # 백테스트용 데이터 가져오기
     bt_data = get_backtest_data(bt_days)
     
     if bt_data is not None and len(bt_data) >= 10:
         # 백테스팅 실행
-        bt_df = run_backtest(bt_data, seed=37000)
+        bt_started = time.perf_counter()
+        bt, metrics = get_backtest(bt_data, **bt_params)
+        bt_ms = (time.perf_counter() - bt_started) * 1000
         
-        if bt_df is not None and len(bt_df) > 0:
-            metrics = calculate_metrics(bt_df, 37000)
+        if bt is not None and len(bt) > 0:
             
             # 기간 정보 표시
-            start_date = bt_df['date'].iloc[0].strftime('%Y.%m.%d')
-            end_date = bt_df['date'].iloc[-1].strftime('%Y.%m.%d')
+            start_date = pd.Timestamp(bt.date[0]).strftime('%Y.%m.%d')
+            end_date = pd.Timestamp(bt.date[-1]).strftime('%Y.%m.%d')
             
             st.markdown(f"""
             <div style="background: #252830; border-radius: 8px; padding: 12px 16px; margin-bottom: 16px;">
                 <span style="color: #6b7280; font-size: 12px;">📅 테스트 기간: </span>
                 <span style="color: #fff; font-size: 12px; font-weight: 600;">{start_date} ~ {end_date}</span>
-                <span style="color: #6b7280; font-size: 12px;"> ({metrics['days']}일)</span>
+                <span style="color: #6b7280; font-size: 12px;"> ({metrics['days']}일) · 계산 {bt_ms:.1f}ms</span>
             </div>
             """, unsafe_allow_html=True)
             
@@ -723,9 +686,9 @@ with tab2:
             st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">📈 자산 추이 비교</div>', unsafe_allow_html=True)
             
             # 차트 데이터 준비
-            sigma_values = bt_df['total_value'].values
-            bh_values = 37000 * (bt_df['close'] / bt_df['close'].iloc[0]).values
-            dates = bt_df['date'].values
+            sigma_values = bt.total_value
+            bh_values = bt_seed * (bt.close / bt.close[0])
+            dates = bt.date
             
             # Plotly 차트 생성
             import plotly.graph_objects as go
@@ -754,11 +717,11 @@ with tab2:
             
             # 초기 자본선 (점선)
             fig.add_hline(
-                y=37000, 
+                y=bt_seed, 
                 line_dash="dash", 
                 line_color="#6b7280",
                 line_width=1,
-                annotation_text="초기자본 $37,000",
+                annotation_text=f"초기자본 ${bt_seed:,.0f}",
                 annotation_position="bottom right",
                 annotation_font_size=10,
                 annotation_font_color="#6b7280"
@@ -926,11 +889,10 @@ with tab2:
             sigma_wins = 0
             bh_wins = 0
             
+            bh_keys = {"total_return": "bh_return"}
             comparisons = [
-                ("수익률", metrics['total_return'], metrics['bh_return'], True),
-                ("MDD", metrics['mdd'], metrics['bh_mdd'], False),  # 낮을수록 좋음
-                ("샤프비율", metrics['sharpe'], metrics['bh_sharpe'], True),
-                ("변동성", metrics['volatility'], metrics['bh_volatility'], False),  # 낮을수록 좋음
+                (name, metrics[key], metrics[bh_keys.get(key, "bh_" + key)], higher_better)
+                for name, key, higher_better in SCOREBOARD
             ]
             
             for name, sigma_val, bh_val, higher_better in comparisons:
@@ -959,17 +921,226 @@ with tab2:
             </div>
             """, unsafe_allow_html=True)
             
+            # 부트스트랩 신뢰구간
+            st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
+            if st.toggle("부트스트랩 신뢰구간 (95%)", key="bt_bootstrap"):
+                boot_params = run_on_demand("bt_bootstrap", {"days": bt_days, **bt_params})
+                boot_days = boot_params.pop("days")
+                with st.spinner("부트스트랩 리샘플링 중..."):
+                    boot = get_bootstrap(get_backtest_data(boot_days), **boot_params)
+                
+                if boot is not None:
+                    bm = boot["metrics"]
+                    sb = boot["scoreboard"]
+                    
+                    def fmt_ci(row, col):
+                        unit = "%p" if col == "diff" and row["unit"] else row["unit"]
+                        spec = ("+" if col == "diff" else "") + (".2f" if row["unit"] else ".3f")
+                        return f"{row[col]:{spec}}{unit} [{row[col + '_lo']:{spec}}, {row[col + '_hi']:{spec}}]"
+                    
+                    significant = [row["name"] for _, row in bm.iterrows() if row["diff_lo"] > 0 or row["diff_hi"] < 0]
+                    st.markdown(f"""
+                    <div style="background: #252830; border-radius: 8px; padding: 12px 16px; margin-bottom: 12px;">
+                        <span style="color: #6b7280; font-size: 12px;">리샘플 {boot['n_resamples']:,}회 · 평균 블록 {boot['block']}일 · 스코어보드 승자 </span>
+                        <span style="color: #fff; font-size: 12px; font-weight: 600;">σ 전략 {sb['sigma']:.1f}% / Buy & Hold {sb['bh']:.1f}% / 무승부 {sb['tie']:.1f}%</span>
+                        <span style="color: #6b7280; font-size: 12px;"> · 차이 구간이 0을 포함하지 않는 지표: {", ".join(significant) if significant else "없음"}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    st.dataframe(pd.DataFrame({
+                        "지표": bm["name"],
+                        "σ 전략": [fmt_ci(row, "strategy") for _, row in bm.iterrows()],
+                        "Buy & Hold": [fmt_ci(row, "bh") for _, row in bm.iterrows()],
+                        "차이 (σ-B&H)": [fmt_ci(row, "diff") for _, row in bm.iterrows()],
+                        "σ 우위 확률": [f"{v:.1f}%" for v in bm["p_better"]]
+                    }), use_container_width=True, hide_index=True)
+            
+            # 결과 내보내기 (클릭 시 생성)
+            st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
+            
+            def export_parquet():
+                export_buf = io.BytesIO()
+                save_results(export_buf, bt, params=bt_params, data=bt_data, metrics=metrics, fmt="parquet")
+                return export_buf.getvalue()
+            
+            st.download_button(
+                "📥 백테스트 결과 다운로드 (Parquet)",
+                export_parquet,
+                file_name=f"upro_backtest_{end_date.replace('.', '')}.parquet",
+                use_container_width=True,
+                key="bt_export"
+            )
+            
+            # 시작일 민감도 분석
+            st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+            st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">🧭 시작일 민감도 분석</div>', unsafe_allow_html=True)
+            
+            window = 126 if bt_period == "6개월" else 252
+            if st.toggle(f"전체 이력의 모든 {bt_period} 구간 분석", key="bt_rolling"):
+                rolling_params = run_on_demand("bt_rolling", {"window": window, **bt_params})
+                windows = get_rolling_windows(get_backtest_data(3650), **rolling_params)
+                
+                if windows is not None and len(windows) > 0:
+                    summary = summarize_windows(windows)
+                    st.markdown(f"""
+                    <div style="background: #252830; border-radius: 8px; padding: 12px 16px; margin-bottom: 12px;">
+                        <span style="color: #6b7280; font-size: 12px;">{windows['start'].iloc[0].strftime('%Y.%m.%d')} ~ {windows['end'].iloc[-1].strftime('%Y.%m.%d')} · {len(windows)}개 구간 · </span>
+                        <span style="color: #fff; font-size: 12px; font-weight: 600;">σ 전략 초과수익 구간 {summary.loc['win_rate', 'excess']:.1f}%</span>
+                        <span style="color: #6b7280; font-size: 12px;"> · MDD 개선 구간 {summary.loc['win_rate', 'mdd_diff']:.1f}%</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    fig_dist = go.Figure()
+                    fig_dist.add_trace(go.Histogram(x=windows['excess'], name='초과수익 (σ-B&H)', marker_color='#3b82f6', opacity=0.75))
+                    fig_dist.add_trace(go.Histogram(x=windows['mdd_diff'], name='MDD 차이 (σ-B&H)', marker_color='#f97316', opacity=0.75))
+                    fig_dist.add_vline(x=0, line_dash="dash", line_color="#6b7280", line_width=1)
+                    fig_dist.update_layout(
+                        barmode='overlay',
+                        plot_bgcolor='#1a1d23',
+                        paper_bgcolor='#1a1d23',
+                        height=300,
+                        margin=dict(l=0, r=0, t=30, b=0),
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(color='#9ca3af', size=12), bgcolor='rgba(0,0,0,0)'),
+                        xaxis=dict(gridcolor='#2a2f38', tickfont=dict(color='#6b7280', size=10), ticksuffix='%p'),
+                        yaxis=dict(gridcolor='#2a2f38', tickfont=dict(color='#6b7280', size=10))
+                    )
+                    st.plotly_chart(fig_dist, use_container_width=True, config={'displayModeBar': False})
+                    
+                    labels = {0.05: "5%", 0.25: "25%", 0.5: "중앙값", 0.75: "75%", 0.95: "95%", "mean": "평균", "win_rate": "양수 비율"}
+                    dist_df = pd.DataFrame({
+                        "분위": [labels[q] for q in summary.index],
+                        "초과수익": [f"{v:+.2f}%p" for v in summary['excess']],
+                        "MDD 차이": [f"{v:+.2f}%p" for v in summary['mdd_diff']],
+                        "σ 수익률": [f"{v:+.2f}%" for v in summary['return']],
+                        "B&H 수익률": [f"{v:+.2f}%" for v in summary['bh_return']]
+                    })
+                    dist_df.loc[dist_df["분위"] == "양수 비율", ["초과수익", "MDD 차이", "σ 수익률", "B&H 수익률"]] = [
+                        f"{summary.loc['win_rate', c]:.1f}%" for c in ['excess', 'mdd_diff', 'return', 'bh_return']
+                    ]
+                    st.dataframe(dist_df, use_container_width=True, hide_index=True)
+                else:
+                    st.info("롤링 윈도우 분석을 위한 이력이 부족합니다.")
+            
+            # 분봉 체결 시뮬레이션 (변환된 분봉 데이터가 있을 때만)
+            if os.path.exists(os.path.join(INTRADAY_DIR, "meta.json")):
+                st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+                st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">⏱️ 분봉 기반 LOC 체결 시뮬레이션</div>', unsafe_allow_html=True)
+                
+                if st.toggle("마감가 불확실성 반영", key="bt_intraday"):
+                    try:
+                        intraday = get_intraday_backtest(bt_data, **bt_params)
+                    except ValueError:
+                        intraday = None
+                        st.info("변환된 분봉 데이터가 이 백테스트 기간과 겹치지 않습니다. 기간을 바꾸거나 해당 기간의 분봉을 변환하세요.")
+                    
+                    if intraday is not None:
+                        fills = intraday["fills"]
+                        path_returns = intraday["paths"]["total_return"]
+                        expected_fills = fills["p_buy"].where(bt.trade_type == TRADE_BUY, 0).sum() + fills["p_sell"].where(bt.trade_type == TRADE_SELL, 0).sum()
+                        st.markdown(f"""
+                        <div style="background: #252830; border-radius: 8px; padding: 12px 16px;">
+                            <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">LOC 가격 근처 마감일 <span style="color: #fff; font-weight: 600;">{int(fills['near_threshold'].sum())}일</span> · 일봉 체결 {metrics['buy_count'] + metrics['sell_count']}건 중 기대 체결 <span style="color: #fff; font-weight: 600;">{expected_fills:.1f}건</span></p>
+                            <p style="color: #6b7280; font-size: 12px; margin: 0;">σ 전략 수익률 일봉 {metrics['total_return']:+.2f}% · 마감가 경로 {len(path_returns)}개 중앙값 <span style="color: #fff; font-weight: 600;">{path_returns.median():+.2f}%</span> (5% {path_returns.quantile(0.05):+.2f}% ~ 95% {path_returns.quantile(0.95):+.2f}%)</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+            
+            # 멀티 티커 포트폴리오
+            st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+            st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">🧺 멀티 티커 포트폴리오 (공용 현금)</div>', unsafe_allow_html=True)
+            
+            if st.toggle("여러 종목을 하나의 현금으로 운용", key="bt_portfolio"):
+                pf1, pf2 = st.columns([3, 1])
+                with pf1:
+                    if "pf_tickers" not in st.session_state: st.session_state.pf_tickers = PORTFOLIO_TICKERS[:3]
+                    pf_tickers = st.multiselect("종목", options=PORTFOLIO_TICKERS, key="pf_tickers")
+                with pf2:
+                    pf_priority = st.selectbox(
+                        "현금 부족 시 우선",
+                        options=list(PORTFOLIO_PRIORITIES),
+                        format_func=lambda p: {"deepest": "하락폭 큰 종목", "order": "선택 순서", "lowest_step": "회차 적은 종목"}[p],
+                        key="pf_priority"
+                    )
+                
+                pf_params = run_on_demand("bt_portfolio", {"days": bt_days, "tickers": pf_tickers, "priority": pf_priority, **bt_params})
+                pf_days = pf_params.pop("days")
+                pf_data = get_market_data(pf_days, tuple(pf_params["tickers"])) if pf_params["tickers"] else None
+                pr = get_portfolio_backtest(pf_data, **pf_params)
+                pf_seed = pf_params["seed"]
+                
+                if pr is not None and len(pr) > 0:
+                    pm = portfolio_metrics(pr, pf_seed)
+                    
+                    fig_pf = go.Figure()
+                    fig_pf.add_trace(go.Scatter(x=pr.date, y=pr.total_value, mode='lines', name='σ 포트폴리오', line=dict(color='#3b82f6', width=3)))
+                    fig_pf.add_trace(go.Scatter(x=pr.date, y=pf_seed * (pr.close / pr.close[0]).mean(axis=1), mode='lines', name='균등 Buy & Hold', line=dict(color='#f97316', width=2, dash='dot')))
+                    fig_pf.update_layout(
+                        plot_bgcolor='#1a1d23',
+                        paper_bgcolor='#1a1d23',
+                        height=300,
+                        margin=dict(l=0, r=0, t=30, b=0),
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(color='#9ca3af', size=12), bgcolor='rgba(0,0,0,0)'),
+                        xaxis=dict(gridcolor='#2a2f38', tickfont=dict(color='#6b7280', size=10)),
+                        yaxis=dict(gridcolor='#2a2f38', tickfont=dict(color='#6b7280', size=10), tickprefix='$', tickformat=',.0f'),
+                        hovermode='x unified'
+                    )
+                    st.plotly_chart(fig_pf, use_container_width=True, config={'displayModeBar': False})
+                    
+                    pf_df = pd.DataFrame({
+                        "종목": pr.tickers,
+                        "매수": (pr.trade_type == TRADE_BUY).sum(axis=0),
+                        "매도": (pr.trade_type == TRADE_SELL).sum(axis=0),
+                        "현금 부족": pr.skipped.sum(axis=0),
+                        "보유 수량": pr.qty[-1],
+                        "회차": pr.step[-1]
+                    })
+                    st.dataframe(pf_df, use_container_width=True, hide_index=True)
+                    st.markdown(f"""
+                    <div style="background: #252830; border-radius: 8px; padding: 12px 16px;">
+                        <span style="color: #6b7280; font-size: 12px;">σ 포트폴리오 </span>
+                        <span style="color: #fff; font-size: 12px; font-weight: 600;">{pm['total_return']:+.2f}% · MDD {pm['mdd']:.2f}%</span>
+                        <span style="color: #6b7280; font-size: 12px;"> / 균등 B&H {pm['bh_return']:+.2f}% · MDD {pm['bh_mdd']:.2f}%</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+                else:
+                    st.info("선택한 종목의 데이터가 부족합니다.")
+            
     else:
         st.warning("📊 백테스팅을 위한 충분한 데이터가 없습니다. 잠시 후 다시 시도해주세요.")
 
 # ==========================================
 # TAB 3: 거래 기록
 # ==========================================
-with tab3:
+@st.fragment
+def render_history_tab():
+    """거래 기록 탭"""
     st.markdown('<div style="color: #9ca3af; font-size: 13px; font-weight: 600; margin-bottom: 12px;">📝 실전 거래 기록</div>', unsafe_allow_html=True)
     
-    if st.session_state.trades:
-        trades_df = pd.DataFrame(st.session_state.trades)
+    store = st.session_state.trade_store
+    
+    if len(store) > 0:
+        # 기간 필터
+        first_day = datetime.strptime(store.dates[0][:10], "%Y-%m-%d").date()
+        last_day = datetime.strptime(store.dates[-1][:10], "%Y-%m-%d").date()
+        # 기록 기간이 바뀌면 (체결 추가 / 초기화) 필터를 전체 기간으로
+        if st.session_state.get("hist_bounds") != (first_day, last_day):
+            st.session_state.hist_bounds = (first_day, last_day)
+            st.session_state.hist_start = first_day
+            st.session_state.hist_end = last_day
+            st.session_state.hist_page = 1
+        f1, f2, f3 = st.columns([2, 2, 1])
+        with f1:
+            start_day = st.date_input("시작일", key="hist_start")
+        with f2:
+            end_day = st.date_input("종료일", key="hist_end")
+        
+        lo, hi = store.range(start_day, end_day)
+        page_size = 20
+        n_pages = max(1, -(-(hi - lo) // page_size))
+        st.session_state.hist_page = min(st.session_state.get("hist_page", 1), n_pages)
+        with f3:
+            page = st.number_input("페이지", min_value=1, max_value=n_pages, step=1, key="hist_page")
+        
+        trades_df = pd.DataFrame(store.page(lo, hi, page, page_size), columns=['date', 'type', 'price', 'qty', 'step'])
         trades_df.columns = ['날짜', '유형', '체결가', '수량', '회차']
         
         # 색상 스타일링
@@ -981,10 +1152,10 @@ with tab3:
             return ''
         
         st.dataframe(trades_df, use_container_width=True, hide_index=True)
+        st.markdown(f'<p style="color: #6b7280; font-size: 11px; text-align: right;">{hi - lo}건 중 {page}/{n_pages} 페이지 (최신순)</p>', unsafe_allow_html=True)
         
-        # 실전 성과 요약
-        buy_trades = [t for t in st.session_state.trades if t['type'] == 'BUY']
-        sell_trades = [t for t in st.session_state.trades if t['type'] == 'SELL']
+        # 실전 성과 요약 (누적 집계)
+        summary = store.summary(lo, hi)
         
         st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
         
@@ -993,21 +1164,47 @@ with tab3:
             st.markdown(f"""
             <div style="background: #252830; border-radius: 8px; padding: 16px; text-align: center;">
                 <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">총 거래</p>
-                <p style="color: #ffffff; font-size: 20px; font-weight: 700; margin: 0;">{len(st.session_state.trades)}회</p>
+                <p style="color: #ffffff; font-size: 20px; font-weight: 700; margin: 0;">{summary['count']}회</p>
             </div>
             """, unsafe_allow_html=True)
         with c2:
             st.markdown(f"""
             <div style="background: #252830; border-radius: 8px; padding: 16px; text-align: center;">
                 <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">매수</p>
-                <p style="color: #22c55e; font-size: 20px; font-weight: 700; margin: 0;">{len(buy_trades)}회</p>
+                <p style="color: #22c55e; font-size: 20px; font-weight: 700; margin: 0;">{summary['buys']}회</p>
             </div>
             """, unsafe_allow_html=True)
         with c3:
             st.markdown(f"""
             <div style="background: #252830; border-radius: 8px; padding: 16px; text-align: center;">
                 <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">매도</p>
-                <p style="color: #ef4444; font-size: 20px; font-weight: 700; margin: 0;">{len(sell_trades)}회</p>
+                <p style="color: #ef4444; font-size: 20px; font-weight: 700; margin: 0;">{summary['sells']}회</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
+        
+        pnl_color = "#22c55e" if summary['realized_pnl'] >= 0 else "#ef4444"
+        c4, c5, c6 = st.columns(3)
+        with c4:
+            st.markdown(f"""
+            <div style="background: #252830; border-radius: 8px; padding: 16px; text-align: center;">
+                <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">실현 손익</p>
+                <p style="color: {pnl_color}; font-size: 20px; font-weight: 700; margin: 0;">${summary['realized_pnl']:+,.2f}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        with c5:
+            st.markdown(f"""
+            <div style="background: #252830; border-radius: 8px; padding: 16px; text-align: center;">
+                <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">승 / 패</p>
+                <p style="color: #ffffff; font-size: 20px; font-weight: 700; margin: 0;">{summary['wins']}승 {summary['losses']}패</p>
+            </div>
+            """, unsafe_allow_html=True)
+        with c6:
+            st.markdown(f"""
+            <div style="background: #252830; border-radius: 8px; padding: 16px; text-align: center;">
+                <p style="color: #6b7280; font-size: 12px; margin: 0 0 6px 0;">평균 보유 기간</p>
+                <p style="color: #ffffff; font-size: 20px; font-weight: 700; margin: 0;">{summary['avg_hold_days']:.1f}일</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -1015,6 +1212,7 @@ with tab3:
         st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
         if st.button("🗑️ 거래 기록 초기화", use_container_width=True, key="clear_trades"):
             st.session_state.trades = []
+            st.session_state.trade_store = TradeStore(st.session_state.trades)
             save_data({
                 "seed": st.session_state.seed,
                 "qty": 0,
@@ -1027,6 +1225,20 @@ with tab3:
     else:
         st.info("📝 아직 기록된 거래가 없습니다. '오늘의 주문' 탭에서 체결을 기록하세요.")
 
+# ==========================================
+# 선택된 탭 실행
+# ==========================================
+with tab1:
+    if tab1.open:
+        render_orders_tab()
+with tab2:
+    if tab2.open:
+        render_backtest_tab()
+with tab3:
+    if tab3.open:
+        render_history_tab()
+mark_phase("tab")
+
 # ==========================================
 # 푸터
 # ==========================================
@@ -1036,3 +1248,14 @@ st.markdown("""
     <p style="color: #374151; font-size: 10px; margin-top: 4px;">⚠️ 투자의 책임은 본인에게 있습니다</p>
 </div>
 """, unsafe_allow_html=True)
+mark_phase("footer")
+
+# 세션 첫 실행의 단계별 시작 시간 (서버 로그, ?timing=1 이면 화면에도 표시)
+if 'startup_report' not in st.session_state:
+    st.session_state.startup_report = startup_report()
+    total_ms = sum(row["ms"] for row in st.session_state.startup_report)
+    LOGGER.info("[startup] %.0fms · %s", total_ms, " · ".join(
+        f"{row['phase']} {row['ms']:.0f}ms" + (" (초과)" if row["over"] else "") for row in st.session_state.startup_report))
+
+if st.query_params.get("timing") == "1":
+    st.dataframe(st.session_state.startup_report, use_container_width=True, hide_index=True)
@@ -0,0 +1,250 @@
+"""시장 데이터 공급자 - yfinance / Yahoo chart API / 로컬 파일 재생
+
+Streamlit 없이 import 가능 (백테스트, 벤치마크, 단독 API를 오프라인으로 실행).
+앱(opp.py)은 여기 공급자를 st.cache_* 로 감싸서 사용.
+
+재생용 파일 만들기:
+    python -m providers market_data.parquet [--days 3650] [--providers yfinance,chart]
+"""
+import abc
+import argparse
+import os
+import threading
+import time
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+
+from engine import TICKER, PORTFOLIO_TICKERS
+
+DEFAULT_PROVIDER = "yfinance,chart"  # 쉼표로 구분, 앞에서부터 시도
+DEFAULT_MARKET_FILE = "market_data.parquet"  # file 공급자 데이터 (CSV / Parquet)
+DEFAULT_TICKERS = (TICKER, "USDKRW=X")
+
+def market_provider_config():
+    """공급자 설정 (LSW_DATA_PROVIDER, 호출할 때마다 환경 변수를 읽음)"""
+    return os.environ.get("LSW_DATA_PROVIDER", DEFAULT_PROVIDER)
+
+def market_file():
+    """file 공급자 기본 경로 (LSW_DATA_FILE)"""
+    return os.environ.get("LSW_DATA_FILE", DEFAULT_MARKET_FILE)
+
+def _yf_period(days):
+    """일 수 → yfinance period 문자열"""
+    if days <= 30:
+        return "1mo"
+    elif days <= 90:
+        return "3mo"
+    elif days <= 180:
+        return "6mo"
+    elif days <= 365:
+        return "1y"
+    elif days <= 730:
+        return "2y"
+    elif days <= 1825:
+        return "5y"
+    return "max"
+
+# ==========================================
+# 공급자
+# ==========================================
+class MarketDataProvider(abc.ABC):
+    """시장 데이터 공급자 - fetch(tickers, days)는 종목별 일봉 종가 DataFrame
+    (인덱스 날짜, 열 종목) 또는 실패 시 None"""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def fetch(self, tickers, days):
+        """종목별 일봉 종가 (인덱스 날짜, 열 종목), 실패 시 None"""
+
+    def simulate_latency(self):
+        """응답 지연 흉내 (네트워크 공급자는 실제로 기다리므로 없음)"""
+
+class YFinanceProvider(MarketDataProvider):
+    """yfinance 일괄 다운로드"""
+
+    name = "yfinance"
+
+    def fetch(self, tickers, days):
+        import yfinance as yf
+        raw = yf.download(tickers, period=_yf_period(days), progress=False, timeout=15)['Close']
+        if raw is not None and not raw.empty and len(raw) >= 2:
+            return raw.dropna()
+        return None
+
+class YahooChartProvider(MarketDataProvider):
+    """Yahoo chart API 직접 호출 (종목별 요청)"""
+
+    name = "chart"
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+    def fetch(self, tickers, days):
+        import requests
+        end = int(time.time())
+        start = end - (days * 24 * 60 * 60)
+        data_dict = {}
+
+        for ticker in tickers:
+            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?period1={start}&period2={end}&interval=1d"
+            resp = requests.get(url, headers=self.headers, timeout=15)
+            if resp.status_code == 200:
+                result = resp.json()['chart']['result'][0]
+                dates = pd.to_datetime(result['timestamp'], unit='s')
+                data_dict[ticker] = pd.Series(result['indicators']['quote'][0]['close'], index=dates)
+
+        if len(data_dict) == len(tickers):
+            return pd.DataFrame(data_dict).dropna()
+        return None
+
+class FileReplayProvider(MarketDataProvider):
+    """로컬 CSV / Parquet 재생 (오프라인 실행, 부하 테스트용)
+
+    파일은 첫 열이 날짜, 나머지 열이 종목별 종가 (record_market_data로 생성 가능).
+    as_of 날짜(기본 파일 마지막 날)를 '오늘'로 보고 최근 days일을 반환하므로
+    같은 설정이면 항상 같은 결과. 요청마다 delay_ms + 0~jitter_ms 지연을
+    넣어 네트워크 공급자를 흉내 냄 (지터는 random_seed로 재현 가능).
+    지연은 simulate_latency에서 적용 - 캐시 적중 시에도 호출.
+    """
+
+    name = "file"
+
+    def __init__(self, path=None, as_of=None, delay_ms=0, jitter_ms=0, random_seed=0):
+        self.path = path or market_file()
+        self.as_of = as_of
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self._rng = np.random.default_rng(random_seed)
+        self._lock = threading.Lock()
+        self._frame = None
+
+    def _load(self):
+        if self._frame is None:
+            if self.path.endswith(".parquet"):
+                frame = pd.read_parquet(self.path)
+            else:
+                frame = pd.read_csv(self.path, index_col=0, parse_dates=True)
+            frame.index = pd.to_datetime(frame.index)
+            self._frame = frame.sort_index()
+        return self._frame
+
+    def simulate_latency(self):
+        with self._lock:
+            delay = self.delay_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def fetch(self, tickers, days):
+        with self._lock:
+            frame = self._load()
+
+        if any(t not in frame.columns for t in tickers):
+            return None
+        end = pd.Timestamp(self.as_of) if self.as_of else frame.index[-1]
+        window = frame.loc[(frame.index > end - pd.Timedelta(days=days)) & (frame.index <= end), list(tickers)].dropna()
+        return window if len(window) >= 2 else None
+
+MARKET_PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "chart": YahooChartProvider,
+    "file": FileReplayProvider,
+}
+
+def make_provider(spec):
+    """공급자 설정 문자열 → 공급자
+
+    "yfinance", "chart", "file" 또는 "file:경로?as_of=2024-12-31&delay_ms=200&jitter_ms=100&seed=1"
+    """
+    name, _, rest = spec.strip().partition(":")
+    if name not in MARKET_PROVIDERS:
+        raise ValueError(f"unknown market data provider: {name}")
+    if name != "file":
+        return MARKET_PROVIDERS[name]()
+
+    path, _, query = rest.partition("?")
+    options = {k: v[-1] for k, v in parse_qs(query).items()}
+    return FileReplayProvider(
+        path,
+        as_of=options.get("as_of"),
+        delay_ms=float(options.get("delay_ms", 0)),
+        jitter_ms=float(options.get("jitter_ms", 0)),
+        random_seed=int(options.get("seed", 0))
+    )
+
+def make_providers(config=None):
+    """쉼표로 구분한 공급자 설정 (기본 LSW_DATA_PROVIDER) → 공급자 목록"""
+    config = config or market_provider_config()
+    return [make_provider(spec) for spec in config.split(",") if spec.strip()]
+
+# ==========================================
+# 조회 / 캐시 / 기록
+# ==========================================
+def fetch_market_data(providers, tickers, days, simulate_latency=True):
+    """공급자를 순서대로 시도해 처음 성공한 결과 (모두 실패 시 None)"""
+    for provider in providers:
+        try:
+            if simulate_latency:
+                provider.simulate_latency()
+            data = provider.fetch(tickers, days)
+            if data is not None and len(data) >= 2:
+                return data
+        except Exception:
+            pass
+    return None
+
+class MarketDataCache:
+    """(days, tickers)별 TTL 캐시 조회 - Streamlit 밖에서 쓰는 get_market_data
+
+    앱의 st.cache_data 래퍼와 같게, 첫 공급자의 지연은 캐시 적중 때도 적용.
+    """
+
+    def __init__(self, providers, ttl=600):
+        self.providers = providers
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, days=60, tickers=None):
+        if self.providers:
+            self.providers[0].simulate_latency()
+        key = (days, tuple(tickers) if tickers else DEFAULT_TICKERS)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        data = fetch_market_data(self.providers, list(key[1]), days, simulate_latency=False)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+        return data
+
+def record_market_data(path=None, days=3650, tickers=None, providers=DEFAULT_PROVIDER):
+    """네트워크 공급자로 받은 종가를 file 공급자용 파일로 저장 (CSV / Parquet)"""
+    path = path or market_file()
+    tickers = list(tickers) if tickers else list(dict.fromkeys([*DEFAULT_TICKERS, *PORTFOLIO_TICKERS]))
+    data = fetch_market_data(make_providers(providers), tickers, days)
+    if data is None:
+        return None
+    data.index.name = "date"
+    if path.endswith(".parquet"):
+        data.to_parquet(path)
+    else:
+        data.to_csv(path)
+    return data
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="file 공급자용 시장 데이터 기록")
+    parser.add_argument("path", nargs="?", default=market_file())
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--tickers", help="쉼표로 구분 (기본: UPRO, USDKRW=X, 포트폴리오 후보)")
+    parser.add_argument("--providers", default=DEFAULT_PROVIDER)
+    args = parser.parse_args(argv)
+
+    tickers = [t.strip() for t in args.tickers.split(",")] if args.tickers else None
+    data = record_market_data(args.path, args.days, tickers, args.providers)
+    if data is None:
+        parser.exit(1, "market data unavailable\n")
+    print(f"{args.path}: {len(data)} rows, {data.index[0]:%Y-%m-%d} ~ {data.index[-1]:%Y-%m-%d}, {', '.join(data.columns)}")
+
+if __name__ == "__main__":
+    main()
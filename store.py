@@ -0,0 +1,136 @@
+"""계좌 데이터 파일 / 거래 기록 저장소
+
+표준 라이브러리만 사용 (앱 시작 시 NumPy / pandas 보다 먼저 import 되고,
+단독 API(python -m api)에서도 사용).
+"""
+import bisect
+import json
+from datetime import datetime
+
+# ==========================================
+# 데이터 저장/로드 함수 (JSON 파일 기반)
+# ==========================================
+DATA_FILE = "lsw_loc_data.json"
+
+def load_data(path=DATA_FILE):
+    """저장된 데이터 로드"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except:
+        return {
+            "seed": 37000.0,
+            "qty": 0,
+            "avg": 0.0,
+            "step": 1,
+            "cash": 37000.0,
+            "trades": [],
+            "daily_records": []
+        }
+
+def save_data(data):
+    """데이터 저장"""
+    with open(DATA_FILE, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+
+# ==========================================
+# 거래 기록 저장소 (날짜 인덱스 + 누적 집계)
+# ==========================================
+class TradeStore:
+    """체결 기록 저장소
+
+    trades 리스트를 그대로 감싸고(저장 시 그대로 사용), 날짜 인덱스와
+    체결별 누적 집계를 추가 시점에 갱신해 기간 필터 / 페이지 / 요약을
+    기록 수와 무관하게 빠르게 계산.
+    """
+
+    def __init__(self, trades):
+        self.trades = trades
+        self.trades.sort(key=lambda t: t["date"])
+        self.dates = []
+        # 체결별 누적값 (0번 = 시작 상태)
+        self.cum_buys = [0]
+        self.cum_sells = [0]
+        self.cum_pnl = [0.0]
+        self.cum_wins = [0]
+        self.cum_losses = [0]
+        self.cum_hold_days = [0]
+        self.cum_closed = [0]  # 보유 포지션을 청산한 매도 (보유 기간 평균의 분모)
+        # 현재 보유 포지션 (기록 기준)
+        self.open_qty = 0
+        self.open_cost = 0.0
+        self.open_since = None
+        for trade in self.trades:
+            self._index(trade)
+
+    def __len__(self):
+        return len(self.trades)
+
+    def append(self, trade):
+        """체결 추가 (시간순)"""
+        self.trades.append(trade)
+        self._index(trade)
+
+    def _index(self, trade):
+        buy = sell = win = loss = hold_days = closed = 0
+        pnl = 0.0
+        price = float(trade["price"])
+        qty = int(trade["qty"])
+        trade_day = datetime.strptime(trade["date"][:10], "%Y-%m-%d")
+        
+        if trade["type"] == "BUY":
+            buy = 1
+            if self.open_qty == 0:
+                self.open_since = trade_day
+            self.open_qty += qty
+            self.open_cost += qty * price
+        elif trade["type"] == "SELL":
+            sell = 1
+            avg_cost = self.open_cost / self.open_qty if self.open_qty > 0 else price
+            pnl = (price - avg_cost) * qty
+            win = int(pnl > 0)
+            loss = int(pnl < 0)
+            if self.open_since is not None:
+                hold_days = (trade_day - self.open_since).days
+                closed = 1
+            self.open_qty = 0
+            self.open_cost = 0.0
+            self.open_since = None
+        
+        self.dates.append(trade["date"])
+        self.cum_buys.append(self.cum_buys[-1] + buy)
+        self.cum_sells.append(self.cum_sells[-1] + sell)
+        self.cum_pnl.append(self.cum_pnl[-1] + pnl)
+        self.cum_wins.append(self.cum_wins[-1] + win)
+        self.cum_losses.append(self.cum_losses[-1] + loss)
+        self.cum_hold_days.append(self.cum_hold_days[-1] + hold_days)
+        self.cum_closed.append(self.cum_closed[-1] + closed)
+
+    def range(self, start=None, end=None):
+        """기간(YYYY-MM-DD, 양끝 포함)에 해당하는 체결 인덱스 범위 (lo, hi)
+
+        시작일이 종료일보다 늦으면 빈 범위 (lo == hi).
+        """
+        lo = bisect.bisect_left(self.dates, str(start)) if start else 0
+        hi = bisect.bisect_right(self.dates, str(end) + "~") if end else len(self.dates)
+        return lo, max(lo, hi)
+
+    def page(self, lo, hi, page=1, page_size=20):
+        """범위 내 체결 페이지 (최신순)"""
+        stop = hi - (page - 1) * page_size
+        start = max(lo, stop - page_size)
+        return self.trades[start:max(start, stop)][::-1]
+
+    def summary(self, lo=0, hi=None):
+        """범위 내 집계 (누적값 차이로 계산)"""
+        hi = len(self.trades) if hi is None else max(lo, hi)
+        closed = self.cum_closed[hi] - self.cum_closed[lo]
+        return {
+            "count": hi - lo,
+            "buys": self.cum_buys[hi] - self.cum_buys[lo],
+            "sells": self.cum_sells[hi] - self.cum_sells[lo],
+            "realized_pnl": self.cum_pnl[hi] - self.cum_pnl[lo],
+            "wins": self.cum_wins[hi] - self.cum_wins[lo],
+            "losses": self.cum_losses[hi] - self.cum_losses[lo],
+            "avg_hold_days": (self.cum_hold_days[hi] - self.cum_hold_days[lo]) / closed if closed > 0 else 0
+        }
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP = os.path.join(ROOT, "opp.py")
+
+
+def synth_market(n=300, seed=0, tickers=("UPRO",)):
+    """기하 브라운 운동 종가 + 환율 (인덱스 영업일)"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2020-01-01", periods=n)
+    data = {}
+    for i, ticker in enumerate(tickers):
+        data[ticker] = 50 * np.exp(np.cumsum(rng.normal(0.0008, 0.03, n)))
+    data["USDKRW=X"] = 1300 + rng.normal(0, 5, n)
+    return pd.DataFrame(data, index=index)
+
+
+@pytest.fixture
+def market_data():
+    return synth_market()
+
+
+@pytest.fixture
+def market_file(tmp_path):
+    """file 공급자용 오프라인 시장 데이터"""
+    path = tmp_path / "market.csv"
+    data = synth_market(800, 1, tickers=("UPRO", "TQQQ", "SOXL", "TECL"))
+    data.index.name = "date"
+    data.to_csv(path)
+    return str(path)
@@ -0,0 +1,52 @@
+import json
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import api
+from conftest import ROOT
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch, market_file):
+    """앱 없이 띄운 API (임의 포트)"""
+    monkeypatch.chdir(tmp_path)
+    server = api.make_server(api.standalone_context(f"file:{market_file}"), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url, headers=None):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as resp:
+        return resp.status, resp.headers, json.loads(resp.read())
+
+
+def test_import_does_not_load_streamlit():
+    code = "import sys, api; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_standalone_routes(server):
+    status, headers, body = get(server + "/orders")
+    assert status == 200 and body["orders"]["default"]["buy_loc"] > 0
+
+    status, headers, body = get(server + "/backtest?buy_mult=0.7")
+    assert status == 200 and body["params"]["buy_mult"] == 0.7
+    with pytest.raises(urllib.error.HTTPError) as e:
+        get(server + "/backtest?buy_mult=0.7", {"If-None-Match": headers["ETag"]})
+    assert e.value.code == 304
+
+    _, _, body = get(server + "/stats")
+    assert body["cache"]["entries"] > 0
+
+
+def test_bad_request(server):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        get(server + "/backtest?weights=a:b")
+    assert e.value.code == 400
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from conftest import APP
+
+TABS = {"orders": "📌 오늘의 주문", "backtest": "📊 백테스팅", "history": "📝 거래 기록"}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, market_file):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LSW_API_PORT", "0")
+    monkeypatch.setenv("LSW_DATA_PROVIDER", f"file:{market_file}")
+    trades = [{"date": f"2024-01-{d:02d} 10:00", "type": "BUY" if d % 2 else "SELL", "price": 40 + d, "qty": 10, "step": 1}
+              for d in range(1, 29)]
+    (tmp_path / "lsw_loc_data.json").write_text(json.dumps({"seed": 37000.0, "trades": trades}))
+    return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def switch(at, tab):
+    at.session_state["main_tab"] = TABS[tab]
+    at.run()
+    assert not at.exception
+
+
+def test_backtest_widgets_survive_tab_switch(app):
+    switch(app, "backtest")
+    app.slider(key="bt_buy_mult").set_value(0.5)
+    app.selectbox(key="bt_period").set_value("6개월")
+    app.toggle(key="bt_bootstrap").set_value(True)
+    app.text_input(key="bt_weights").set_value("1:2:3").run()
+
+    switch(app, "orders")
+    switch(app, "backtest")
+    assert app.slider(key="bt_buy_mult").value == 0.5
+    assert app.selectbox(key="bt_period").value == "6개월"
+    assert app.toggle(key="bt_bootstrap").value
+    assert app.text_input(key="bt_weights").value == "1:2:3"
+
+    app.button(key="bt_reset").click().run()
+    assert app.slider(key="bt_buy_mult").value == 0.85
+    assert app.selectbox(key="bt_period").value == "6개월"
+
+
+def test_history_filters_survive_tab_switch(app):
+    import datetime
+
+    switch(app, "history")
+    assert app.date_input(key="hist_start").value == datetime.date(2024, 1, 1)
+    app.date_input(key="hist_start").set_value(datetime.date(2024, 1, 10)).run()
+    app.number_input(key="hist_page").set_value(1).run()
+
+    switch(app, "backtest")
+    switch(app, "history")
+    assert app.date_input(key="hist_start").value == datetime.date(2024, 1, 10)
+    assert app.date_input(key="hist_end").value == datetime.date(2024, 1, 28)
+
+
+def test_heavy_section_keeps_last_result_until_recompute(app):
+    switch(app, "backtest")
+    app.toggle(key="bt_bootstrap").set_value(True).run()
+    tables = len(app.dataframe)
+    assert tables == 2
+
+    app.slider(key="bt_buy_mult").set_value(0.5).run()
+    assert len(app.dataframe) == tables
+    assert any("매수 0.85" in c.value for c in app.caption)
+
+    app.button(key="bt_bootstrap_run").click().run()
+    assert len(app.dataframe) == tables
+    assert not any(c.value.startswith("이전 파라미터 결과") for c in app.caption)
+    assert app.session_state["bt_bootstrap_params"]["buy_mult"] == 0.5
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import engine
+from conftest import synth_market
+
+METRIC_KEYS = ("total_return", "cagr", "mdd", "sharpe", "volatility", "win_rate")
+
+
+def assert_matches_backtest(data, n_sigma, weights, buy_mult, sell_mult, region):
+    metrics = engine.calculate_metrics(engine.run_backtest(data, 37000, n_sigma, buy_mult, sell_mult, weights), 37000)
+    for key in METRIC_KEYS:
+        assert np.isclose(metrics[key], region[key], rtol=1e-9, atol=1e-9), (buy_mult, sell_mult, key)
+    assert (metrics["buy_count"], metrics["sell_count"]) == (region["buy_count"], region["sell_count"])
+
+
+@pytest.mark.parametrize("seed, n_sigma, weights", [(0, 2, [1, 1, 2]), (1, 5, [1, 1, 1, 1])])
+def test_regions_match_run_backtest(seed, n_sigma, weights):
+    data = synth_market(300, seed)
+    partition = engine.partition_parameter_space(data, n_sigma=n_sigma, weights=weights)
+    regions = partition["regions"]
+    assert np.isclose(regions["area"].sum(), (engine.MULT_RANGE[1] - engine.MULT_RANGE[0]) ** 2)
+
+    # 영역 중심
+    for _, region in regions.sample(min(40, len(regions)), random_state=0).iterrows():
+        assert_matches_backtest(data, n_sigma, weights, region["buy_mult"], region["sell_mult"], region)
+
+    # 임의의 점 → 그 점을 포함하는 유일한 영역
+    rng = np.random.default_rng(seed)
+    for buy_mult, sell_mult in rng.uniform(*engine.MULT_RANGE, size=(20, 2)):
+        inside = regions[(regions["buy_lo"] < buy_mult) & (buy_mult < regions["buy_hi"])
+                         & (regions["sell_lo"] < sell_mult) & (sell_mult < regions["sell_hi"])]
+        assert len(inside) == 1
+        assert_matches_backtest(data, n_sigma, weights, buy_mult, sell_mult, inside.iloc[0])
+
+
+def test_best_region_beats_grid():
+    data = synth_market(300, 2)
+    best = engine.partition_parameter_space(data, n_sigma=2, weights=[1, 1, 2])["best"]
+    grid = np.arange(-2.0, 2.0001, 0.25)
+    grid_best = max(engine.calculate_metrics(engine.run_backtest(data, 37000, 2, b, s, [1, 1, 2]), 37000)["total_return"]
+                    for b in grid for s in grid)
+    assert best["total_return"] >= grid_best - 1e-9
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+import providers
+from conftest import ROOT
+
+
+def test_import_does_not_load_streamlit():
+    code = "import sys, providers; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_base_provider_is_abstract():
+    with pytest.raises(TypeError):
+        providers.MarketDataProvider()
+
+
+def test_file_replay_window(market_file):
+    provider = providers.make_provider(f"file:{market_file}?as_of=2021-06-30")
+    data = provider.fetch(["UPRO", "TQQQ"], 30)
+    assert list(data.columns) == ["UPRO", "TQQQ"]
+    assert data.index[-1] <= providers.pd.Timestamp("2021-06-30")
+    assert (data.index[-1] - data.index[0]).days < 30
+    assert provider.fetch(["NOPE"], 30) is None
+
+
+def test_cache_hit_still_pays_replay_delay(market_file):
+    load = providers.MarketDataCache(providers.make_providers(f"file:{market_file}?delay_ms=50"))
+    first = load(60)
+    started = time.perf_counter()
+    assert load(60) is first
+    assert time.perf_counter() - started >= 0.05
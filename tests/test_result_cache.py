@@ -0,0 +1,65 @@
+import json
+import socket
+import threading
+import urllib.request
+
+import engine
+from conftest import APP
+
+
+def test_put_counts_backtest_nbytes_and_freezes(market_data):
+    bt = engine.run_backtest(market_data)
+    cache = engine.ResultCache()
+    cache.put("bt", bt)
+    assert cache.bytes == bt.nbytes
+    assert not bt.close.flags.writeable
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def app_result_cache(port):
+    """앱이 띄운 API 서버가 쓰는 결과 캐시 (앱의 st.cache_resource 인스턴스)"""
+    for thread in threading.enumerate():
+        server = getattr(getattr(thread, "_target", None), "__self__", None)
+        if server is not None and server.server_address[1] == port:
+            return server.context.result_cache
+    raise AssertionError(f"no API server on port {port}")
+
+
+def test_byte_budget_holds_after_rerun(tmp_path, monkeypatch, market_file):
+    from streamlit.testing.v1 import AppTest
+
+    port = free_port()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LSW_API_PORT", str(port))
+    monkeypatch.setenv("LSW_DATA_PROVIDER", f"file:{market_file}")
+
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.session_state["main_tab"] = "📊 백테스팅"
+    at.run()
+    at.slider(key="bt_buy_mult").set_value(0.5).run()  # 재실행 후 새 파라미터 결과
+    assert not at.exception
+
+    cache = app_result_cache(port)
+    # 같은 프로세스의 다른 AppTest도 이 캐시를 공유 - 기본값 / 0.5 결과가 모두 있는지만 확인
+    entries = {key: value for key, value in cache._entries.items() if key[0] == "backtest"}
+    assert {engine.BUY_MULT, 0.5} <= {key[4] for key in entries}
+    backtests = [value[0] for value, _ in entries.values()]
+    assert all(isinstance(bt, engine.BacktestResult) for bt in backtests)
+    assert not any(bt.close.flags.writeable or bt.total_value.flags.writeable for bt in backtests)
+
+    # 항목별 크기는 배열 nbytes 이상으로 잡히고 합계가 캐시 바이트와 같음
+    for key, (value, nbytes) in cache._entries.items():
+        if key[0] == "backtest":
+            assert nbytes >= value[0].nbytes
+    assert cache.bytes == sum(nbytes for _, nbytes in cache._entries.values())
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats") as resp:
+        stats = json.loads(resp.read())["cache"]
+    assert stats["bytes"] >= sum(bt.nbytes for bt in backtests)
+    assert stats["bytes"] <= stats["max_bytes"]
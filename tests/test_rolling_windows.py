@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+import engine
+from conftest import synth_market
+
+
+@pytest.mark.parametrize("seed, n_sigma, weights", [(0, 2, [1, 1, 2]), (1, 5, [1, 1, 1, 1])])
+def test_windows_match_run_backtest_per_window(seed, n_sigma, weights):
+    data = synth_market(300, seed)
+    window = 60
+    windows = engine.rolling_window_analysis(data, window, n_sigma=n_sigma, weights=weights)
+    assert len(windows) > 0
+
+    for _, row in windows.iterrows():
+        s = data.index.get_loc(row["start"])
+        bt = engine.run_backtest(data.iloc[s - n_sigma - 1:s + window], n_sigma=n_sigma, weights=weights)
+        metrics = engine.calculate_metrics(bt, 37000)
+        for key, col in (("total_return", "return"), ("mdd", "mdd"), ("bh_return", "bh_return"), ("bh_mdd", "bh_mdd")):
+            assert np.isclose(metrics[key], row[col], atol=1e-6), (row["start"], key)
@@ -0,0 +1,27 @@
+from store import TradeStore
+
+
+def trade(day, kind, price=40.0, qty=10):
+    return {"date": f"2024-01-{day:02d} 10:00", "type": kind, "price": price, "qty": qty, "step": 1}
+
+
+def test_inverted_range_is_empty():
+    store = TradeStore([trade(d, "BUY" if d % 2 else "SELL", 40 + d) for d in range(1, 21)])
+    lo, hi = store.range("2024-01-15", "2024-01-05")
+    assert lo == hi
+    summary = store.summary(lo, hi)
+    assert summary["count"] == summary["buys"] == summary["sells"] == summary["wins"] == 0
+    assert summary["realized_pnl"] == 0
+    assert store.page(lo, hi) == []
+
+
+def test_avg_hold_days_counts_only_closing_sells():
+    store = TradeStore([
+        trade(1, "SELL"),             # 보유 없이 매도 - 보유 기간 없음
+        trade(2, "BUY"),
+        trade(5, "BUY"),
+        trade(8, "SELL", price=45.0),  # 2일에 연 포지션 청산 - 6일
+    ])
+    summary = store.summary()
+    assert summary["sells"] == 2
+    assert summary["avg_hold_days"] == 6